@@ -3,41 +3,84 @@ import pandas as pd
 # from transformers import pipeline
 # from wordcloud import WordCloud
 # import matplotlib.pyplot as plt
-import subprocess
+import json
 import sys
 import os
-import time
+import perf
+from model_manager import ModelManager
+from paged_table import paged_table
+from report import build_report, score_reviews
+from review_facts import build_facts_frame
+from review_index import MonthIndex
+from scrape_jobs import JobRunner
+from sentiment_cache import SentimentCache
+from sentiment_models import MODEL_OPTIONS, cache_key, load_pipeline
+from storage import TABLES, get_store, load_table
+from word_freq import frequencies as word_frequencies, render_png, update_word_freqs
 
-MODEL_OPTIONS = {
-    "DistilBERT (Fast)": "distilbert-base-uncased-finetuned-sst-2-english",
-    "RoBERTa (Accurate)": "cardiffnlp/twitter-roberta-base-sentiment-latest",
-    "BERT (Standard)": "nlptown/bert-base-multilingual-uncased-sentiment"
-}
 # Set page configuration
 st.set_page_config(page_title="Data Mining Dashboard", layout="wide")
 
 # --- NLP SETUP ---
-# We cache the model so it doesn't reload every time you move the slider
+# Models stay loaded between reruns, but only as many as fit in SENTIMENT_RAM_BUDGET_MB
+PRELOAD_MODEL = os.environ.get("SENTIMENT_PRELOAD", list(MODEL_OPTIONS.keys())[0])
+
 @st.cache_resource
+def get_model_manager():
+    # SENTIMENT_BACKEND=int8/onnx serves a quantized copy through the same interface
+    manager = ModelManager(lambda model_name: load_pipeline(MODEL_OPTIONS[model_name]))
+    if PRELOAD_MODEL in MODEL_OPTIONS:
+        manager.preload(PRELOAD_MODEL)
+    return manager
+
 def load_sentiment_model(model_name):
-    # Move the import here so it only happens when someone clicks 'Analyze'
-    from transformers import pipeline 
-    
-    # Force PyTorch and use a smaller version of the model if possible
-    return pipeline("sentiment-analysis", 
-                    model=MODEL_OPTIONS[model_name], 
-                    framework="pt",device=-1)
+    with perf.span("model_load", model=model_name):
+        return get_model_manager().get(model_name)
+
+# Persistent cache of scored reviews, shared by every session
+@st.cache_resource
+def get_sentiment_cache():
+    cache = SentimentCache()
+    cache.prune_models([cache_key(m) for m in MODEL_OPTIONS.values()])
+    return cache
 # --- DATA LOADING HELPERS ---
-@st.cache_data
-def load_data(filename):
+# The store version is part of the cache key, so a finished scrape is picked up on the next rerun.
+# Room for the current and the previous version of every table; older copies are dropped
+@st.cache_data(max_entries=2 * len(TABLES))
+def _load_table(table, version):
     try:
-        df = pd.read_csv(filename)
-        if 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date']).dt.date
-        return df
+        return load_table(table)
     except Exception as e:
         return pd.DataFrame()
 
+# Background scrape jobs, shared by every session of this server
+@st.cache_resource
+def get_job_runner():
+    return JobRunner(lambda: {table: get_store().version(table) for table in TABLES})
+
+def load_data(table):
+    # Versions stay pinned while a scrape is writing, then every table moves on together
+    with perf.span("load_data", table=table) as s:
+        df = _load_table(table, get_job_runner().data_versions()[table])
+        s.rows = len(df)
+    return df
+
+# Built once per data load; shared by every session and every slider move.
+# Two entries: the current index and the previous one while sessions still pin the old version
+@st.cache_resource(max_entries=2)
+def get_month_index(version):
+    return MonthIndex(_load_table("reviews", version))
+
+# Counts words of reviews added since the last run (normally already done at ingest)
+@st.cache_resource
+def sync_word_freqs(reviews_version):
+    return update_word_freqs()
+
+@st.cache_data(max_entries=64)
+def wordcloud_png(periods, version):
+    freqs = word_frequencies(periods)
+    return render_png(freqs) if freqs else None
+
 # --- SIDEBAR NAVIGATION ---
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to:", ["Products", "Reviews", "Testimonials"])
@@ -46,66 +89,124 @@ page = st.sidebar.radio("Go to:", ["Products", "Reviews", "Testimonials"])
 # st.sidebar.divider()
 st.sidebar.subheader("⚙️ Run Web-Scraper")
 
-# Create two columns for the buttons
-col_vis, col_head = st.sidebar.columns(2)
+def scraper_commands(headless):
+    # One browser session and one listing pass for every table (same output as scraper_all.py + scraper_product_reviews.py)
+    scripts = ["web_scraping_scripts/scraper_unified.py"]
+    # SCRAPER_ENGINE=http scrapes without a browser (Chrome only as fallback)
+    if os.environ.get("SCRAPER_ENGINE") == "http":
+        scripts = ["web_scraping_scripts/http_engine.py"]
+    commands = []
+    for script in scripts:
+        cmd = [sys.executable, script]
+        if headless:
+            cmd.append("--headless")
+        # SCRAPER_INCREMENTAL=1 resumes from checkpoints and only upserts new/changed rows
+        if os.environ.get("SCRAPER_INCREMENTAL") == "1" and "scraper_" in script:
+            cmd.append("--incremental")
+        commands.append(cmd)
+    return commands
 
-status_placeholder = st.sidebar.empty()
+def start_scrape(headless):
+    missing = [cmd[1] for cmd in scraper_commands(headless) if not os.path.exists(cmd[1])]
+    if missing:
+        st.sidebar.error(f"Missing: {', '.join(missing)}")
+        return
+    if get_job_runner().start("Headless" if headless else "Visible", scraper_commands(headless)) is None:
+        st.sidebar.warning("A scrape is already running.")
 
-def execute_scrapers(headless):
-    scripts = [
-        "web_scraping_scripts/scraper_all.py",
-        "web_scraping_scripts/scraper_product_reviews.py"
-    ]
-    try:
-        for script in scripts:
-            if os.path.exists(script):
-                mode_text = "Headless" if headless else "Visible"
-                status_placeholder.warning(f"⏳ {mode_text}: {os.path.basename(script)}")
-                
-                # Build command
-                cmd = [sys.executable, script]
-                if headless:
-                    cmd.append("--headless")
-                
-                subprocess.run(cmd, check=True)
-                st.toast(f"✅ {os.path.basename(script)} done!")
-            else:
-                st.sidebar.error(f"Missing: {script}")
-        
-        status_placeholder.success("🎉 Data Updated!")
-        st.balloons()
-        time.sleep(1)
+def scrape_progress():
+    runner = get_job_runner()
+    job = runner.job
+    other = runner.busy_elsewhere()
+    if other:
+        st.info(f"⏳ A {other['label']} scrape is running in another session.")
+    if job is None:
+        return
+
+    if job.running:
+        st.warning(f"⏳ {job.label}: {job.stage} ({job.elapsed():.0f}s)")
+        for section, c in job.counts.items():
+            pages = f"{c['pages']} pages" if c["pages"] else ""
+            items = f"{c['items']} items" if c["items"] else ""
+            st.caption(f"{section}: {', '.join(x for x in (pages, items) if x)}")
+        if st.button("Cancel", use_container_width=True):
+            job.cancel()
+    elif job.state == "done":
+        st.success(f"🎉 Data Updated! ({job.elapsed():.0f}s)")
+    elif job.state == "cancelled":
+        st.info("Scrape cancelled.")
+    else:
+        st.error(f"❌ Error: {job.error}")
+    if job.lines:
+        with st.expander("Scraper log"):
+            st.code("\n".join(list(job.lines)[-20:]))
+
+    # Each session reloads once when the job it is watching ends; the data switches over in one go
+    if not job.running and st.session_state.get("reloaded_job") != job.started:
+        st.session_state["reloaded_job"] = job.started
+        if job.state == "done":
+            st.balloons()
         st.rerun()
-    except Exception as e:
-        status_placeholder.error(f"❌ Error: {e}")
 
-# Button logic
-if col_vis.button("Visible", use_container_width=True, help="Watch the browser scrape"):
-    execute_scrapers(headless=False)
+# Buttons start a background job; progress refreshes every second without rerunning the page
+job_running = get_job_runner().job is not None and get_job_runner().job.running
+col_vis, col_head = st.sidebar.columns(2)
+if col_vis.button("Visible", use_container_width=True, help="Watch the browser scrape", disabled=job_running):
+    start_scrape(headless=False)
+    st.rerun()
+
+if col_head.button("Headless", use_container_width=True, help="Scrape in the background", disabled=job_running):
+    start_scrape(headless=True)
+    st.rerun()
+
+with st.sidebar:
+    st.fragment(scrape_progress, run_every=1 if job_running else None)()
+# Loaded sentiment models and their memory
+model_manager = get_model_manager()
+with st.sidebar.expander("🧠 Loaded Models"):
+    resident = model_manager.resident()
+    if resident:
+        for entry in resident:
+            st.write(f"**{entry['model']}** – {entry['mb']:.0f} MB")
+    else:
+        st.write("No model loaded yet.")
+    st.caption(f"{model_manager.resident_mb():.0f} / {model_manager.budget_mb:.0f} MB budget")
+
+# Stage timings of this run (filled in at the end of the page); off by default
+perf_box = st.sidebar.expander("⏱️ Performance")
+perf_recorder = perf.Recorder() if perf_box.toggle("Record stage timings", key="perf_enabled") else None
+perf.activate(perf_recorder)
 
-if col_head.button("Headless", use_container_width=True, help="Scrape in the background"):
-    execute_scrapers(headless=True)
 st.title(f"Scraped Data: {page}")
 st.sidebar.error("⚠️ **Remote Scraping Only Works Locally(not Render)**")
 
 if page == "Products":
     st.header("🛒 Product Catalog")
-    df_products = load_data("data/products.csv")
-    st.dataframe(df_products, use_container_width=True, hide_index=True)
+    df_products = load_data("products")
+    paged_table(df_products, "products")
 
 elif page == "Testimonials":
     st.header("💬 Customer Testimonials")
-    df_test = load_data("data/testimonials.csv")
-    st.dataframe(df_test, use_container_width=True, hide_index=True)
+    df_test = load_data("testimonials")
+    paged_table(df_test, "testimonials")
 
 elif page == "Reviews":
-    st.header("⭐ Review & Product Intelligence (2023)")
-    df_reviews = load_data("data/reviews.csv")
-    df_products = load_data("data/products.csv")
+    df_reviews = load_data("reviews")
+    df_products = load_data("products")
 
     if not df_reviews.empty:
+        # Only built for stored reviews (an empty frame has no Date column to index)
+        with perf.span("month_index"):
+            month_index = get_month_index(get_job_runner().data_versions()["reviews"])
+        years = month_index.years()
+        year_span = f"{years[0]}–{years[-1]}" if len(years) > 1 else (f"{years[0]}" if years else "")
+        st.header(f"⭐ Review & Product Intelligence ({year_span})")
+
         # 1. Slider & Sync Logic
-        months_options = ["All", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+        periods = month_index.periods()
+        months_options = ["All"] + [MonthIndex.label(p) for p in periods]
+        if st.session_state.get("month_slider") not in months_options:
+            st.session_state.month_slider = "All"
         col_slider, col_all = st.columns([4, 1])
         
         with col_all:
@@ -115,34 +216,29 @@ elif page == "Reviews":
                 st.rerun()
 
         with col_slider:
-            selected_period = st.select_slider("Select a month in 2023:", options=months_options, key="month_slider")
+            selected_period = st.select_slider("Select a month:", options=months_options, key="month_slider")
 
-        # 2. Filtering Logic
-        if selected_period == "All":
-            filtered_df = df_reviews.copy()
-            show_wordcloud = False
-            view_title = "All Reviews (2023)"
-        else:
-            month_num = months_options.index(selected_period)
-            df_reviews['Date'] = pd.to_datetime(df_reviews['Date'])
-            filtered_df = df_reviews[
-                (df_reviews['Date'].dt.year == 2023) & 
-                (df_reviews['Date'].dt.month == month_num)
-            ].copy()
-            filtered_df['Date'] = filtered_df['Date'].dt.date
-            show_wordcloud = True
-            view_title = f"Reviews for {selected_period} 2023"
+        # 2. Filtering Logic (precomputed month ranges, the cached frame is never touched)
+        with perf.span("month_filter") as s:
+            if selected_period == "All":
+                filtered_df = df_reviews.copy()
+                show_wordcloud = False
+                view_title = f"All Reviews ({year_span})"
+            else:
+                year, month_num = periods[months_options.index(selected_period) - 1]
+                filtered_df = month_index.month(year, month_num).copy()
+                show_wordcloud = True
+                view_title = f"Reviews for {selected_period}"
+            s.rows = len(filtered_df)
 
         # --- WORD CLOUD (Only when Month selected) ---
         if show_wordcloud and not filtered_df.empty:
-            from wordcloud import WordCloud
-            import matplotlib.pyplot as plt
             st.subheader(f"Word Cloud for {selected_period}")
-            text = " ".join(review for review in filtered_df.Review_Text.astype(str))
-            wordcloud = WordCloud(width=800, height=300, background_color='black').generate(text)
-            fig, ax = plt.subplots(figsize=(10, 4))
-            ax.imshow(wordcloud, interpolation='bilinear'); ax.axis("off")
-            st.pyplot(fig)
+            with perf.span("wordcloud"):
+                sync_word_freqs(get_job_runner().data_versions()["reviews"])
+                png = wordcloud_png((f"{year}-{month_num:02d}",), get_job_runner().data_versions()["word_freq"])
+            if png:
+                st.image(png, use_container_width=True)
             st.divider()
 
         # 3. Main Display & Analyze Trigger
@@ -153,138 +249,153 @@ elif page == "Reviews":
             with col_drop:
                 selected_model_key = st.selectbox("Model Selector", list(MODEL_OPTIONS.keys()), label_visibility="collapsed")
             with col_btn:
-                analyze_clicked = st.button("🔍 Run Full Intelligence Report", use_container_width=True)
+                if st.button("🔍 Run Full Intelligence Report", use_container_width=True):
+                    st.session_state.report_for = (selected_period, selected_model_key)
 
-            if analyze_clicked:
-                with st.spinner('Processing NLP Analysis...'):
-                    # 1. Run Sentiment Analysis
-                    current_pipeline = load_sentiment_model(selected_model_key)
-                    results = current_pipeline(filtered_df['Review_Text'].tolist())
-                    
-                    labels, scores = [], []
-                    for res in results:
-                        label = res['label'].upper()
-                        labels.append("POSITIVE" if any(x in label for x in ['POS', '4', '5', 'LABEL_1']) else "NEGATIVE")
-                        scores.append(res['score'])
-
-                    filtered_df['Sentiment'] = labels
-                    filtered_df['Confidence'] = scores # Kept in background for logic, but hidden in display
-
-                    # --- 2. DETAILED REVIEW LOG ---
-                    st.divider()
-                    st.subheader("📋 Detailed Review Log")
-                    def color_sentiment(val):
-                        if val == "POSITIVE": return 'background-color: rgba(0, 255, 0, 0.2);'
-                        if val == "NEGATIVE": return 'background-color: rgba(255, 0, 0, 0.2);'
-                        return ''
-                    
-                    # Dropping Confidence here as requested
-                    display_df = filtered_df.drop(columns=['Confidence'])
-                    st.dataframe(display_df.style.applymap(color_sentiment, subset=['Sentiment']), 
-                                 use_container_width=True, hide_index=True)
-
-                    # --- 3. METRICS & BAR CHART ---
-                    st.divider()
-                    st.subheader(f"Sentiment Distribution ({selected_model_key})")
-                    avg_conf = filtered_df['Confidence'].mean()
-                    
-                    # Only showing Confidence Metric now
-                    st.metric("Avg. Model Confidence", f"{avg_conf:.2%}")
-                    st.bar_chart(filtered_df['Sentiment'].value_counts())
-
-                    # --- 4. PRODUCT SENTIMENT SUMMARY ---
-                    st.divider()
-                    st.header("📦 Product Sentiment Summary")
-                    df_map = load_data("data/product_reviews.csv")
-                    merged_p = pd.merge(df_map, df_products, on="pid", how="left")
-                    final_intel_df = pd.merge(filtered_df, merged_p, on="rid", how="left")
-                    final_intel_df['Title'] = final_intel_df['Title'].fillna("Unlinked Reviews")
-                    
-                    product_stats = final_intel_df.groupby(['Title', 'Sentiment']).size().unstack(fill_value=0)
-                    if "POSITIVE" not in product_stats: product_stats["POSITIVE"] = 0
-                    if "NEGATIVE" not in product_stats: product_stats["NEGATIVE"] = 0
-                    
-                    st.dataframe(product_stats, use_container_width=True)
+            # The button only fires for one rerun; the report stays up (paging, sorting its tables)
+            # until the month or the model changes, and is built once per month, model and data version
+            if st.session_state.get("report_for") == (selected_period, selected_model_key):
+                versions = get_job_runner().data_versions()
+                report_key = (selected_period, selected_model_key,
+                              tuple(versions[t] for t in ("reviews", "products", "product_reviews", "review_sentiment", "review_facts")))
+                if st.session_state.get("report_data", {}).get("key") != report_key:
+                    with st.spinner('Processing NLP Analysis...'):
+                        # 1. Run Sentiment Analysis (precomputed at ingest -> cache -> model, same engine as report.py)
+                        # The fact table (built at ingest) holds the stored scores and every review's product
+                        df_facts = load_data("review_facts")
+                        if df_facts.empty:
+                            with perf.span("facts_build") as s:
+                                df_facts = build_facts_frame(df_reviews, load_data("product_reviews"), df_products,
+                                                             load_data("review_sentiment"))
+                                s.rows = len(df_facts)
+                        with perf.span("sentiment", model=selected_model_key) as s:
+                            scored_df, counts = score_reviews(filtered_df, selected_model_key, df_facts,
+                                                              get_sentiment_cache(), lambda: load_sentiment_model(selected_model_key))
+                            s.rows = len(scored_df)
+                        report = build_report(scored_df, df_facts)
+                    # One report per session; the next month, model or scrape replaces it
+                    st.session_state.report_data = {"key": report_key, "scored": scored_df, "counts": counts, "report": report}
+                filtered_df, counts, report = (st.session_state.report_data[k] for k in ("scored", "counts", "report"))
 
-                    # --- 5. TOP/BOTTOM LISTS (Logic: Negative Ratio >= 40%) ---
-                    st.divider()
-                    col_top, col_bot = st.columns(2)
-                    
-                    # Calculate Ratios
-                    product_stats['Total'] = product_stats['POSITIVE'] + product_stats['NEGATIVE']
-                    product_stats['Neg_Ratio'] = product_stats['NEGATIVE'] / product_stats['Total']
-                    
-                    # Filter out the "Unlinked Reviews" placeholder from the rankings
-                    rank_df = product_stats.get(product_stats.index != "Unlinked Reviews", product_stats)
-
-                    with col_top:
-                        st.success("🏆 Top Rated Products")
-                        # High performance: Products where negative reviews are less than 40% 
-                        # and they have at least 1 positive review.
-                        top_rated = rank_df[rank_df['Neg_Ratio'] < 0.4].sort_values(by='POSITIVE', ascending=False)
-                        
-                        if not top_rated.empty:
-                            for p in top_rated.index[:5]: 
-                                ratio = top_rated.loc[p, 'Neg_Ratio']
-                                st.write(f"✅ **{p}** ({ratio:.0%} Neg)")
-                        else:
-                            st.write("No products meet the top-rated criteria.")
-
-                    with col_bot:
-                        st.error("🚩 Needs Improvement (≥40% Negative)")
-                        # Flagged: Products where negative reviews make up 40% or more of total reviews
-                        needs_help = rank_df[rank_df['Neg_Ratio'] >= 0.4].sort_values(by='Neg_Ratio', ascending=False)
-                        
-                        if not needs_help.empty:
-                            for p in needs_help.index[:5]:
-                                ratio = needs_help.loc[p, 'Neg_Ratio']
-                                st.write(f"❌ **{p}** ({ratio:.0%} Neg)")
-                        else:
-                            st.write("All products are currently below the 40% negative threshold!")
-
-                    # --- 6. STARS VS SENTIMENT ANOMALIES (NOW AT THE BOTTOM) ---
-                    st.divider()
-                    st.header("🔍 Anomaly Detection: Stars vs. Sentiment")
-                    st.info("These cases represent a mismatch between the customer's rating and the AI's interpretation of their text.")
+                cache_stats = get_sentiment_cache().stats()
+                st.caption(f"⚡ {counts['precomputed']} precomputed, {counts['cached']} cached, {counts['live']} scored live · "
+                           f"cache: {cache_stats['entries']:,}/{cache_stats['max_entries']:,} entries, "
+                           f"{cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses ({cache_stats['hit_rate']:.0%}) since start")
+
+                # --- 2. DETAILED REVIEW LOG ---
+                st.divider()
+                st.subheader("📋 Detailed Review Log")
+                # Dropping Confidence here as requested; colors come from one lookup per visible page
+                display_df = filtered_df.drop(columns=['Confidence'])
+                paged_table(display_df, "review_log", color_column='Sentiment')
+
+                # --- 3. METRICS & BAR CHART ---
+                st.divider()
+                st.subheader(f"Sentiment Distribution ({selected_model_key})")
+                avg_conf = filtered_df['Confidence'].mean()
+                
+                # Only showing Confidence Metric now
+                st.metric("Avg. Model Confidence", f"{avg_conf:.2%}")
+                st.bar_chart(filtered_df['Sentiment'].value_counts())
+
+                # --- 4. PRODUCT SENTIMENT SUMMARY ---
+                st.divider()
+                st.header("📦 Product Sentiment Summary")
+                if report["near_links"]:
+                    st.caption(f"{report['near_links']} reviews linked as near-duplicates "
+                               f"(confidence ≥ {report['near_min_confidence']:.0%}).")
+                paged_table(report["product_stats"].drop(columns=['Total', 'Neg_Ratio']), "product_stats", hide_index=False)
+
+                # --- 5. TOP/BOTTOM LISTS (Logic: Negative Ratio >= 40%) ---
+                st.divider()
+                col_top, col_bot = st.columns(2)
+
+                with col_top:
+                    st.success("🏆 Top Rated Products")
+                    # High performance: Products where negative reviews are less than 40% 
+                    # and they have at least 1 positive review.
+                    top_rated = report["top_rated"]
                     
-                    filtered_df['Stars'] = pd.to_numeric(filtered_df['Stars'], errors='coerce')
+                    if not top_rated.empty:
+                        for p in top_rated.index[:5]: 
+                            ratio = top_rated.loc[p, 'Neg_Ratio']
+                            st.write(f"✅ **{p}** ({ratio:.0%} Neg)")
+                    else:
+                        st.write("No products meet the top-rated criteria.")
 
-                    # Case A: Low Stars (1-3) but Positive Sentiment
-                    anomalies_pos = filtered_df[(filtered_df['Stars'] <= 3) & (filtered_df['Sentiment'] == "POSITIVE")]
+                with col_bot:
+                    st.error("🚩 Needs Improvement (≥40% Negative)")
+                    # Flagged: Products where negative reviews make up 40% or more of total reviews
+                    needs_help = report["needs_improvement"]
                     
-                    # Case B: High Stars (4-5) but Negative Sentiment
-                    anomalies_neg = filtered_df[(filtered_df['Stars'] >= 4) & (filtered_df['Sentiment'] == "NEGATIVE")]
-
-                    col_a, col_b = st.columns(2)
-                    with col_a:
-                        st.warning("⚠️ Low Stars but Positive Text")
-                        if not anomalies_pos.empty:
-                            st.write(f"Found **{len(anomalies_pos)}** possible errors")
-                            # Showing text and stars without confidence
-                            st.dataframe(anomalies_pos[['Stars', 'Review_Text']], use_container_width=True, hide_index=True)
-                        else:
-                            st.write("No anomalies found.")
-
-                    with col_b:
-                        st.error("📉 High Stars but Negative Text")
-                        if not anomalies_neg.empty:
-                            st.write(f"Found **{len(anomalies_neg)}** possible errors")
-                            st.dataframe(anomalies_neg[['Stars', 'Review_Text']], use_container_width=True, hide_index=True)
-                        else:
-                            st.write("No anomalies found.")
+                    if not needs_help.empty:
+                        for p in needs_help.index[:5]:
+                            ratio = needs_help.loc[p, 'Neg_Ratio']
+                            st.write(f"❌ **{p}** ({ratio:.0%} Neg)")
+                    else:
+                        st.write("All products are currently below the 40% negative threshold!")
+
+                # --- 6. STARS VS SENTIMENT ANOMALIES (NOW AT THE BOTTOM) ---
+                st.divider()
+                st.header("🔍 Anomaly Detection: Stars vs. Sentiment")
+                st.info("These cases represent a mismatch between the customer's rating and the AI's interpretation of their text.")
+                
+                # Case A: Low Stars (1-3) but Positive Sentiment / Case B: High Stars (4-5) but Negative Sentiment
+                anomalies_pos = report["anomalies_low_stars_positive"]
+                anomalies_neg = report["anomalies_high_stars_negative"]
+
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.warning("⚠️ Low Stars but Positive Text")
+                    if not anomalies_pos.empty:
+                        st.write(f"Found **{len(anomalies_pos)}** possible errors")
+                        # Showing text and stars without confidence
+                        paged_table(anomalies_pos[['Stars', 'Review_Text']], "anomalies_pos")
+                    else:
+                        st.write("No anomalies found.")
+
+                with col_b:
+                    st.error("📉 High Stars but Negative Text")
+                    if not anomalies_neg.empty:
+                        st.write(f"Found **{len(anomalies_neg)}** possible errors")
+                        paged_table(anomalies_neg[['Stars', 'Review_Text']], "anomalies_neg")
+                    else:
+                        st.write("No anomalies found.")
             else:
-                st.dataframe(filtered_df, use_container_width=True, hide_index=True)
+                paged_table(filtered_df, "reviews")
         
         else:
             # This is where your line was incorporated
             st.info(f"No reviews found for {selected_period}.")
+
+    else:
+        st.header("⭐ Review & Product Intelligence")
+        st.info("No reviews stored yet. Run the scraper from the sidebar first.")
             
+# --- PERFORMANCE PANEL ---
+if perf_recorder is not None:
+    with perf_box:
+        spans = perf_recorder.frame()
+        if spans.empty:
+            st.caption("No stages recorded in this run.")
+        else:
+            # Nested stages are indented under the stage that ran them
+            spans["stage"] = spans["depth"].map(lambda d: "· " * d) + spans["name"]
+            st.dataframe(spans[["stage", "seconds", "rows", "peak_growth_mb", "rss_mb"]].round(3),
+                         use_container_width=True, hide_index=True)
+            st.caption(f"Peak RSS {spans['peak_rss_mb'].max():.0f} MB")
+            col_json, col_trace = st.columns(2)
+            col_json.download_button("JSON", json.dumps({"summary": perf_recorder.summary(), "spans": perf_recorder.spans},
+                                                        default=str), "perf.json", "application/json")
+            col_trace.download_button("Trace", json.dumps(perf_recorder.trace(), default=str), "perf.trace.json",
+                                      "application/json", help="Open in chrome://tracing or ui.perfetto.dev")
+
 # elif page == "Products with Reviews":
 #     st.header("🔗 Linked Products & Reviews")
     
-#     df_p = load_data("data/products.csv")
-#     df_r = load_data("data/reviews.csv")
-#     df_map = load_data("data/product_reviews.csv")
+#     df_p = load_data("products")
+#     df_r = load_data("reviews")
+#     df_map = load_data("product_reviews")
 
 #     if not df_map.empty and not df_p.empty and not df_r.empty:
 #         merged_p = pd.merge(df_map, df_p, on="pid", how="inner")
@@ -0,0 +1,332 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Times the dashboard and scraper code paths on synthetic corpora of growing size and compares
+# the result with a saved baseline, so a slowdown shows up before it is deployed:
+#   python benchmarks/run.py --sizes 1000,10000,100000 --save-baseline   # on main
+#   python benchmarks/run.py --sizes 1000,10000,100000                   # on the branch, exits 1 on a regression
+script_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(script_dir, "..")
+sys.path.insert(0, root_dir)
+sys.path.insert(0, os.path.join(root_dir, "web_scraping_scripts"))
+
+from review_facts import build_facts, build_facts_frame
+from review_index import MonthIndex
+from review_linker import link_stored
+from report import build_report, score_reviews
+from sentiment_cache import SentimentCache
+from sentiment_models import MODEL_OPTIONS, load_pipeline
+from storage import CsvStore, ParquetStore, SqliteStore, load_table, read_table, reviews_in_month, write_table
+from word_freq import FREQ_TABLE, STATE_TABLE, frequencies, render_png, update_word_freqs
+
+from synthetic import generate, write_corpus
+from tiny_model import TinySentimentPipeline
+
+RESULTS_DIR = os.path.join(script_dir, "results")
+BASELINE_PATH = os.path.join(script_dir, "baseline.json")
+DEFAULT_SIZES = "1000,10000,100000"
+TOLERANCE = 0.25  # slower than the baseline by more than this share is a regression...
+MIN_DELTA = 0.02  # ...and by more than this many seconds, so timer noise on tiny cases is not flagged
+
+# Packages a case may need that this machine does not have to install; any other failed import
+# is a broken build and counts as an error
+OPTIONAL_DEPENDENCIES = {"wordcloud", "matplotlib", "selenium", "onnxruntime", "optimum", "transformers", "torch"}
+
+
+# --- CASES ---
+# name -> (setup, run); setup is not timed, run returns the number of rows it went through
+CASES = {}
+
+def case(name, setup=None):
+    def register(run):
+        CASES[name] = (setup, run)
+        return run
+    return register
+
+
+@case("load_data")
+def _load_data(ctx):
+    return sum(len(load_table(table, store=ctx.store)) for table in ("products", "reviews", "testimonials", "product_reviews"))
+
+
+@case("month_index")
+def _month_index(ctx):
+    ctx.month_index = MonthIndex(ctx.reviews)
+    return len(ctx.reviews)
+
+
+def _need_month_index(ctx):
+    ctx.month_index = getattr(ctx, "month_index", None) or MonthIndex(ctx.reviews)
+
+@case("month_filter", setup=_need_month_index)
+def _month_filter(ctx):
+    # Every month of the slider, as the Reviews page slices it
+    return sum(len(ctx.month_index.month(*period).copy()) for period in ctx.month_index.periods())
+
+
+@case("month_query")
+def _month_query(ctx):
+    year, month = ctx.busiest
+    return len(reviews_in_month(year, month, store=ctx.store))
+
+
+def _reset_word_freqs(ctx):
+    # From scratch every run, like the first sync after a large scrape
+    write_table(FREQ_TABLE, read_table(FREQ_TABLE, store=ctx.store).iloc[:0], store=ctx.store)
+    write_table(STATE_TABLE, read_table(STATE_TABLE, store=ctx.store).iloc[:0], store=ctx.store)
+
+@case("word_freq", setup=_reset_word_freqs)
+def _word_freq(ctx):
+    return update_word_freqs(store=ctx.store)
+
+
+def _need_word_freqs(ctx):
+    if read_table(FREQ_TABLE, store=ctx.store).empty:
+        update_word_freqs(store=ctx.store)
+
+@case("wordcloud", setup=_need_word_freqs)
+def _wordcloud(ctx):
+    freqs = frequencies([f"{ctx.busiest[0]}-{ctx.busiest[1]:02d}"], store=ctx.store)
+    render_png(freqs)
+    return len(freqs)
+
+
+@case("link_reviews_to_ids")
+def _link(ctx):
+    # The post-scrape stage: relink every product-page review, then rebuild the fact table
+    linked = link_stored(ctx.store)
+    build_facts(ctx.store)
+    return len(linked)
+
+
+def _need_links(ctx):
+    if "rid" not in read_table("product_reviews", store=ctx.store):
+        link_stored(ctx.store)
+    ctx.product_reviews = read_table("product_reviews", store=ctx.store)
+
+@case("facts_build", setup=_need_links)
+def _facts_build(ctx):
+    ctx.facts = build_facts_frame(ctx.reviews, ctx.product_reviews, ctx.products)
+    return len(ctx.facts)
+
+
+def _need_facts(ctx):
+    if getattr(ctx, "facts", None) is None:
+        _need_links(ctx)
+        _facts_build(ctx)
+    # Labels that roughly follow the stars, as a model would give
+    rng = np.random.default_rng(0)
+    positive = (ctx.reviews["Stars"].to_numpy() >= 4) ^ (rng.random(len(ctx.reviews)) < 0.1)
+    ctx.scored = ctx.reviews.assign(Sentiment=np.where(positive, "POSITIVE", "NEGATIVE"), Confidence=0.9)
+
+@case("product_report", setup=_need_facts)
+def _product_report(ctx):
+    build_report(ctx.scored, ctx.facts)
+    return len(ctx.scored)
+
+
+def _sentiment_case(model_name):
+    def setup(ctx):
+        # An empty cache, so every review goes through the model
+        path = os.path.join(ctx.tmp, "sentiment_cache.sqlite")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        ctx.cache = SentimentCache(path)
+        if model_name not in ctx.pipes:
+            model_id = MODEL_OPTIONS[model_name]
+            ctx.pipes[model_name] = load_pipeline(model_id) if ctx.args.real_models else TinySentimentPipeline(model_id)
+
+    def run(ctx):
+        sample = ctx.reviews.iloc[:ctx.args.sentiment_rows]
+        score_reviews(sample, model_name, None, ctx.cache, lambda: ctx.pipes[model_name])
+        return len(sample)
+    return setup, run
+
+for _model_name in MODEL_OPTIONS:
+    CASES[f"sentiment[{_model_name}]"] = _sentiment_case(_model_name)
+
+
+# --- SCRAPERS AGAINST THE FIXTURE SERVER ---
+def _fixture_site(ctx):
+    from fixture_server import generate_fixtures, start_server
+
+    if getattr(ctx, "base_url", None) is None:
+        folder = os.path.join(ctx.tmp, "fixtures")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_fixtures(folder, store=ctx.store)
+        ctx.server, ctx.base_url = start_server(folder, latency=ctx.args.latency)
+
+@case("scrape_http", setup=_fixture_site)
+def _scrape_http(ctx):
+    from http_engine import scrape_http
+
+    result = scrape_http(ctx.base_url, save=False)
+    return len(result["products"]) + len(result["reviews"]) + len(result["testimonials"])
+
+
+@case("scrape_mapping", setup=_fixture_site)
+def _scrape_mapping(ctx):
+    from scraper_product_reviews import scrape_mapping
+
+    return len(scrape_mapping(headless_mode=True, base_url=ctx.base_url, delay=0, save=False))
+
+SCRAPER_CASES = ("scrape_http", "scrape_mapping")
+
+
+# --- RUNNER ---
+def make_store(backend, folder):
+    if backend == "csv":
+        return CsvStore(folder)
+    if backend == "parquet":
+        return ParquetStore(folder)
+    return SqliteStore(os.path.join(folder, "store.sqlite"))
+
+
+def time_case(name, ctx, repeat):
+    setup, run = CASES[name]
+    runs, rows = [], 0
+    try:
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(sys.stdout if ctx.args.verbose else io.StringIO()):
+                if setup:
+                    setup(ctx)
+                start = time.perf_counter()
+                rows = run(ctx)
+                runs.append(time.perf_counter() - start)
+    except ImportError as e:
+        if (e.name or "").split(".")[0] in OPTIONAL_DEPENDENCIES:
+            return {"skipped": str(e)}
+        return {"error": f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return {"seconds": round(min(runs), 5), "runs": [round(r, 5) for r in runs], "rows": int(rows or 0)}
+
+
+def run_size(n_rows, args, selected):
+    tmp = tempfile.mkdtemp(prefix=f"bench-{n_rows}-")
+    try:
+        store = make_store(args.backend, tmp)
+        tables = generate(n_rows, args.seed)
+        write_corpus(tables, store)
+        reviews = load_table("reviews", store=store)
+        months = tables["reviews"]["Date"].map(lambda d: (d.year, d.month)).value_counts()
+        ctx = SimpleNamespace(args=args, tmp=tmp, store=store, reviews=reviews, products=tables["products"],
+                              busiest=months.index[0], pipes={}, base_url=None, server=None)
+
+        results = {}
+        for name in selected:
+            # The scrapers only run on the smallest corpus: they measure fetching, not data size
+            if name in SCRAPER_CASES and (args.no_scrapers or n_rows != min(args.sizes)):
+                continue
+            results[f"{name}@{n_rows}"] = result = time_case(name, ctx, args.repeat)
+            print(f"  {name:<32} {_describe(result)}")
+        if ctx.server is not None:
+            ctx.server.shutdown()
+        return results
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _describe(result):
+    if "seconds" in result:
+        rate = f"{result['rows'] / result['seconds']:,.0f} rows/s" if result["seconds"] and result["rows"] else ""
+        return f"{result['seconds']:9.4f}s  {rate}"
+    return f"skipped ({result['skipped']})" if "skipped" in result else f"ERROR {result['error']}"
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    # (name, baseline seconds, seconds, ratio, regressed) for every case timed in both runs
+    rows = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name, {})
+        if "seconds" not in result or not base.get("seconds"):
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        regressed = ratio > 1 + tolerance and result["seconds"] - base["seconds"] > MIN_DELTA
+        rows.append((name, base["seconds"], result["seconds"], ratio, regressed))
+    return rows
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root_dir, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard and scraper code paths on synthetic data")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated review counts (e.g. 1000,...,1000000)")
+    parser.add_argument("--cases", default=None, help="Comma separated case names or prefixes (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest one counts")
+    parser.add_argument("--backend", choices=["sqlite", "parquet", "csv"], default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sentiment-rows", type=int, default=5000, help="Reviews scored per sentiment case")
+    parser.add_argument("--real-models", action="store_true", help="Score with the real models instead of the offline stand-in")
+    parser.add_argument("--no-scrapers", action="store_true", help="Skip the fixture-server scraper runs")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fixture server adds to every response")
+    parser.add_argument("--out", default=None, help="Results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed slowdown share before a case regresses")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the code under test")
+    args = parser.parse_args(argv)
+    args.sizes = [int(s) for s in args.sizes.split(",")]
+    wanted = args.cases.split(",") if args.cases else None
+    selected = [name for name in CASES if not wanted or any(name.startswith(w) for w in wanted)]
+
+    results = {}
+    for n_rows in args.sizes:
+        print(f"--- {n_rows} reviews ---")
+        results.update(run_size(n_rows, args, selected))
+
+    report = {"environment": environment(), "settings": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+              "results": results}
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    failed = [name for name, result in results.items() if "error" in result]
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("platform") != report["environment"]["platform"]:
+            print("Note: the baseline was recorded on a different machine, timings may not compare")
+        print(f"--- Against baseline {baseline.get('environment', {}).get('commit') or args.baseline} ---")
+        for name, base, now, ratio, regressed in compare(results, baseline, args.tolerance):
+            flag = "REGRESSION" if regressed else ("faster" if ratio < 1 - args.tolerance else "")
+            print(f"  {name:<40} {base:9.4f}s -> {now:9.4f}s  {ratio - 1:+7.1%}  {flag}")
+            if regressed:
+                regressions.append(name)
+    if args.save_baseline:
+        shutil.copyfile(out, args.baseline)
+        print(f"Saved as baseline: {args.baseline}")
+
+    if failed:
+        print(f"FAILED: {', '.join(failed)}")
+    if regressions:
+        print(f"REGRESSED: {', '.join(regressions)}")
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
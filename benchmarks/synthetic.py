@@ -0,0 +1,121 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Synthetic products / reviews / testimonials / product_reviews in the stored schemas, at any
+# size, reproducible from a seed. Product-page reviews are copies of global reviews, some with
+# scraping noise (case, quotes, punctuation) and some with a word dropped, so both linker passes
+# get work.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, ".."))
+
+REVIEWS_PER_PRODUCT = 100
+TITLES_PER_PRODUCT = 0.5
+SITE_URL = "https://web-scraping.dev"
+TESTIMONIALS_PER_REVIEW = 0.1
+MAPPED_SHARE = 0.6   # reviews that also show up on a product page
+NOISY_SHARE = 0.1    # of those, copies with different case/quotes/punctuation
+NEAR_SHARE = 0.03    # of those, copies with one word missing
+START_DATE = "2022-01-01"
+DAYS = 730
+
+ADJECTIVES = ["Dark Red", "Blue", "Classic", "Cat-Ear", "Box of", "Teal", "Limited", "Deluxe", "Retro", "Spicy",
+              "Sweet", "Giant", "Mini", "Gaming", "Cozy", "Silver", "Golden", "Wild", "Smooth", "Tropical"]
+NOUNS = ["Energy Potion", "Beanie", "Sneakers", "Headphones", "Chocolate Candy", "Mug", "Backpack", "Hoodie",
+         "Cola", "Keyboard", "Socks", "Poster", "Candle", "Tea", "Mouse Pad", "Notebook"]
+OPENERS = ["Absolutely love this", "Not what I expected from this", "Great value for the", "I bought this",
+           "Terrible quality on the", "My kids enjoy the", "The best", "Disappointed with the", "Solid",
+           "Would not recommend the", "Five stars for the", "It's fun, the"]
+MIDDLES = ["flavor is refreshing", "fits perfectly", "broke after a week", "arrived quickly", "keeps me energized",
+           "looks great on my desk", "tastes like cherry cola", "is too small", "feels premium",
+           "smells amazing", "lost its color", "is comfortable all day", "was well received as a gift"]
+CLOSERS = ["Will buy again.", "Never again.", "Highly recommended!", "Okay for the price.", "Love it!",
+           "Returned it.", "Perfect for gamers.", "Great gift idea.", "Meh.", "Exceeded my expectations."]
+TESTIMONIALS = ["We've been using this utility for years - awesome service!", "Simplified my workflow significantly.",
+                "Support answered within minutes.", "The app crashes too often.", "Fair pricing and great docs.",
+                "Setup took longer than promised.", "Our whole team relies on it.", "Could be faster."]
+
+
+def _pick(rng, words, n):
+    return np.asarray(words, dtype=object)[rng.integers(0, len(words), n)]
+
+
+def _sentences(rng, n):
+    # Opener + product noun + middle + closer, plus an index-free tail so texts are mostly distinct
+    tail = pd.Series(rng.integers(0, 10_000, n)).map(lambda k: f" (order #{k})" if k % 3 else "").to_numpy(dtype=object)
+    return (_pick(rng, OPENERS, n) + " " + _pick(rng, NOUNS, n).astype(str) + ", it " + _pick(rng, MIDDLES, n)
+            + ". " + _pick(rng, CLOSERS, n) + tail)
+
+
+def generate(n_reviews, seed=0):
+    rng = np.random.default_rng(seed)
+    n_products = max(10, n_reviews // REVIEWS_PER_PRODUCT)
+    n_testimonials = max(10, int(n_reviews * TESTIMONIALS_PER_REVIEW))
+
+    # Titles repeat through the catalog like on the real site (25 products, 12 titles):
+    # only the detail-page link tells those products apart
+    n_titles = max(1, int(n_products * TITLES_PER_PRODUCT))
+    titles = (_pick(rng, ADJECTIVES, n_titles) + " " + _pick(rng, NOUNS, n_titles))[np.arange(n_products) % n_titles]
+    pids = np.arange(1, n_products + 1)
+    products = pd.DataFrame({
+        "pid": pids,
+        "Title": titles,
+        "Description": "Enjoy our " + titles + ". " + _pick(rng, CLOSERS, n_products),
+        "Price": pd.Series(rng.integers(199, 9999, n_products) / 100).map("${:.2f}".format),
+        "Link": SITE_URL + "/product/" + pids.astype(str).astype(object),
+    })
+
+    stars = rng.integers(1, 6, n_reviews)
+    dates = pd.Timestamp(START_DATE) + pd.to_timedelta(rng.integers(0, DAYS, n_reviews), unit="D")
+    reviews = pd.DataFrame({
+        "rid": np.arange(1, n_reviews + 1),
+        "Date": dates.date,
+        "Review_Text": _sentences(rng, n_reviews),
+        "Stars": stars,
+    })
+
+    testimonials = pd.DataFrame({
+        "tid": np.arange(1, n_testimonials + 1),
+        "Testimonial_Text": _pick(rng, TESTIMONIALS, n_testimonials),
+        "Stars": rng.integers(1, 6, n_testimonials),
+    })
+
+    # Product pages show a sample of the reviews, as scraped (no rid yet)
+    mapped = np.flatnonzero(rng.random(n_reviews) < MAPPED_SHARE)
+    texts = reviews["Review_Text"].to_numpy()[mapped].copy()
+    kind = rng.random(len(mapped))
+    noisy = kind < NOISY_SHARE
+    texts[noisy] = (pd.Series(texts[noisy], dtype=object).str.upper()
+                    .str.replace("'", "’").str.replace(",", " ,").to_numpy(dtype=object))
+    near = (kind >= NOISY_SHARE) & (kind < NOISY_SHARE + NEAR_SHARE)
+    texts[near] = pd.Series(texts[near], dtype=object).str.replace(r"^(\S+) \S+ ", r"\1 ", regex=True).to_numpy(dtype=object)
+    product_reviews = pd.DataFrame({
+        "pid": rng.integers(1, n_products + 1, len(mapped)),
+        "Review_Text": texts,
+    }).sort_values("pid", kind="stable").reset_index(drop=True)
+
+    return {"products": products, "reviews": reviews, "testimonials": testimonials, "product_reviews": product_reviews}
+
+
+def write_corpus(tables, store):
+    from storage import write_table
+
+    for table, df in tables.items():
+        write_table(table, df, store=store)
+
+
+if __name__ == "__main__":
+    from storage import CsvStore
+
+    parser = argparse.ArgumentParser(description="Write a synthetic corpus as CSV files")
+    parser.add_argument("--rows", type=int, default=10_000, help="Number of reviews")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Folder for the CSV files")
+    args = parser.parse_args()
+
+    tables = generate(args.rows, args.seed)
+    write_corpus(tables, CsvStore(args.out))
+    print(f"SUCCESS: Wrote {', '.join(f'{len(df)} {name}' for name, df in tables.items())} to {args.out}")
@@ -0,0 +1,45 @@
+import re
+
+# Offline stand-in for the sentiment pipelines: same call signature, tokenizer attribute and
+# raw label vocabulary as the real model of each MODEL_OPTIONS entry, but a word-list score
+# instead of a transformer. Benchmarks time the engine around the model (bucketing, batching,
+# cache, label mapping) without downloads; real inference time needs --real-models.
+_word = re.compile(r"\w+")
+POSITIVE_WORDS = {"love", "great", "best", "recommended", "perfect", "refreshing", "premium", "amazing",
+                  "comfortable", "solid", "enjoy", "exceeded", "fun", "energized", "perfectly", "quickly"}
+NEGATIVE_WORDS = {"not", "terrible", "disappointed", "broke", "never", "returned", "meh", "small", "lost",
+                  "crashes", "expected"}
+
+
+class TinyTokenizer:
+    model_max_length = 512
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        limit = max_length or self.model_max_length
+        # [CLS] words [SEP], like the real tokenizers' lengths (roughly)
+        return {"input_ids": [list(range(min(len(_word.findall(t)) + 2, limit))) for t in texts]}
+
+
+class TinySentimentPipeline:
+    def __init__(self, model_id):
+        self.model_id = model_id
+        self.tokenizer = TinyTokenizer()
+
+    def _label(self, balance):
+        # Raw labels as each real model spells them
+        if self.model_id.startswith("nlptown/"):
+            stars = 3 + max(-2, min(2, balance))
+            return f"{stars} star" if stars == 1 else f"{stars} stars"
+        if self.model_id.startswith("cardiffnlp/"):
+            return "positive" if balance > 0 else "negative" if balance < 0 else "neutral"
+        return "POSITIVE" if balance >= 0 else "NEGATIVE"
+
+    def __call__(self, texts, batch_size=None, truncation=True, max_length=None):
+        if isinstance(texts, str):
+            texts = [texts]
+        out = []
+        for text in texts:
+            words = _word.findall(text.lower())
+            balance = sum(w in POSITIVE_WORDS for w in words) - sum(w in NEGATIVE_WORDS for w in words)
+            out.append({"label": self._label(balance), "score": min(0.99, 0.6 + 0.1 * abs(balance))})
+        return out
@@ -0,0 +1,104 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from perf import rss_mb
+
+# RAM the resident sentiment pipelines may use together before the oldest is dropped
+DEFAULT_BUDGET_MB = float(os.environ.get("SENTIMENT_RAM_BUDGET_MB", 1024))
+
+
+def pipeline_size_mb(pipe):
+    # Bytes held by the weights, when the model exposes them (PyTorch)
+    model = getattr(pipe, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0.0
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors) / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+class ModelManager:
+    def __init__(self, loader, budget_mb=DEFAULT_BUDGET_MB):
+        self.loader = loader
+        self.budget_mb = budget_mb
+        self._models = OrderedDict()  # name -> {"pipe", "mb", "last_used"}, oldest first
+        self._known_mb = {}           # sizes of models seen before, used to make room up front
+        self._lock = threading.RLock()
+        self._load_locks = {}
+
+    def get(self, name):
+        with self._lock:
+            if name in self._models:
+                return self._touch(name)
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Only one thread loads a given model, the others wait for it
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    return self._touch(name)
+                self._make_room(self._known_mb.get(name, 0.0), keep=None)
+
+            gc.collect()
+            rss_before = rss_mb()
+            pipe = self.loader(name)
+            mb = max(pipeline_size_mb(pipe), rss_mb() - rss_before)
+
+            with self._lock:
+                self._models[name] = {"pipe": pipe, "mb": mb, "last_used": time.time()}
+                self._known_mb[name] = mb
+                self._make_room(0.0, keep=name)
+            return pipe
+
+    def _touch(self, name):
+        self._models.move_to_end(name)
+        entry = self._models[name]
+        entry["last_used"] = time.time()
+        return entry["pipe"]
+
+    def _make_room(self, needed_mb, keep):
+        # Drop least-recently-used pipelines until the budget fits (the one just loaded always stays)
+        evicted = False
+        while self._models and self.resident_mb() + needed_mb > self.budget_mb:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            print(f"Evicting sentiment model '{oldest}' ({self._models[oldest]['mb']:.0f} MB)")
+            del self._models[oldest]
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def evict(self, name):
+        with self._lock:
+            if self._models.pop(name, None) is not None:
+                gc.collect()
+
+    def resident_mb(self):
+        with self._lock:
+            return sum(entry["mb"] for entry in self._models.values())
+
+    def resident(self):
+        # Most recently used first
+        with self._lock:
+            return [
+                {"model": name, "mb": round(entry["mb"], 1), "last_used": entry["last_used"]}
+                for name, entry in reversed(self._models.items())
+            ]
+
+    def preload(self, name):
+        # Loads a model in the background so the first click does not pay for it
+        def _run():
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Preloading '{name}' failed: {e}")
+
+        thread = threading.Thread(target=_run, name=f"preload-{name}", daemon=True)
+        thread.start()
+        return thread
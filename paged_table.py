@@ -0,0 +1,73 @@
+import streamlit as st
+
+import perf
+
+# Server-side paginated table: sorting and slicing happen here and only the visible page is sent
+# to the browser, so a view of 50k reviews costs the same to render as one of 50.
+PAGE_SIZES = (25, 50, 100, 250)
+DEFAULT_PAGE_SIZE = 50
+
+# Row colors by sentiment (the original Styler colors)
+SENTIMENT_COLORS = {
+    "POSITIVE": "background-color: rgba(0, 255, 0, 0.2);",
+    "NEGATIVE": "background-color: rgba(255, 0, 0, 0.2);",
+}
+
+
+def page_slice(df, page, page_size, sort_by=None, ascending=True):
+    # Returns (rows of the page, number of pages); only the sort column is sorted, not the whole frame
+    n_pages = max(1, -(-len(df) // page_size))
+    page = min(max(page, 1), n_pages)
+    start = (page - 1) * page_size
+    if sort_by is None or sort_by not in df:
+        return df.iloc[start:start + page_size], n_pages
+    order = df[sort_by].reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last")
+    return df.iloc[order.index[start:start + page_size]], n_pages
+
+
+def cell_styles(values, palette):
+    # One css string per row of a column, from a lookup instead of a function call per cell
+    return values.map(palette).fillna("").to_numpy()
+
+
+def paged_table(df, key, color_column=None, palette=SENTIMENT_COLORS, hide_index=True, default_sort=None):
+    if df.empty:
+        st.dataframe(df, use_container_width=True, hide_index=hide_index)
+        return
+
+    if not hide_index:
+        # Index labels (e.g. product titles) stay visible and sortable as a regular column
+        df = df.reset_index()
+        hide_index = True
+    columns = list(df.columns)
+
+    col_sort, col_order, col_size, col_page = st.columns([3, 2, 2, 2])
+    with col_sort:
+        sort_by = st.selectbox("Sort by", ["(original order)"] + columns, key=f"{key}_sort",
+                               index=columns.index(default_sort) + 1 if default_sort in columns else 0)
+    with col_order:
+        ascending = st.radio("Order", ["Asc", "Desc"], horizontal=True, key=f"{key}_order") == "Asc"
+    with col_size:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_size")
+
+    n_pages = max(1, -(-len(df) // page_size))
+    # A shorter frame (new filter, smaller page count) must not leave the page past the end
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    with col_page:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+
+    rows, _ = page_slice(df, int(page), page_size, None if sort_by == "(original order)" else sort_by, ascending)
+    start = (int(page) - 1) * page_size
+    st.caption(f"Rows {start + 1}–{start + len(rows)} of {len(df)}")
+
+    if color_column and color_column in rows:
+        # Styler needs unique row labels; the index is hidden anyway
+        rows = rows.reset_index(drop=True)
+        styles = cell_styles(rows[color_column], palette)
+        view = rows.style.apply(lambda _: styles, subset=[color_column])
+    else:
+        view = rows
+    with perf.span("render", table=key) as s:
+        st.dataframe(view, use_container_width=True, hide_index=hide_index)
+        s.rows = len(rows)
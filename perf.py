@@ -0,0 +1,205 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+# Stage timings for the dashboard and the scrapers:
+#   with perf.span("merge", table="reviews") as s:
+#       ...
+#       s.rows = len(df)
+# records wall time, the process RSS, how far the span raised the peak RSS, and a row count.
+# Nothing is recorded until a recorder is active; until then a span is one shared no-op object.
+#   PERF_TRACE=<folder> python <script>   writes <script>-<time>-<pid>.json (spans + per-stage summary)
+#                                         and .trace.json (chrome://tracing, ui.perfetto.dev) at exit
+# The dashboard activates a recorder per run from its sidebar Performance panel.
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else 0
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KB elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def rss_mb():
+    # Resident memory of this process now (Linux), the peak elsewhere; also what model_manager sizes models with
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+class Recorder:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def summary(self):
+        # Per stage name: calls, total and longest wall time, rows, largest peak growth
+        stages = {}
+        for s in self.spans:
+            st = stages.setdefault(s["name"], {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "peak_growth_mb": 0.0})
+            st["calls"] += 1
+            st["seconds"] = round(st["seconds"] + s["seconds"], 6)
+            st["max_seconds"] = max(st["max_seconds"], s["seconds"])
+            st["rows"] += s["rows"] or 0
+            st["peak_growth_mb"] = max(st["peak_growth_mb"], s["peak_growth_mb"] or 0.0)
+        return stages
+
+    def frame(self):
+        # In start order, so a stage comes before the stages nested in it
+        import pandas as pd
+        return pd.DataFrame(self.spans, columns=["name", "depth", "start", "seconds", "rows", "rss_mb", "peak_rss_mb",
+                                                 "peak_growth_mb", "thread", "meta", "error"]).sort_values("start", kind="stable")
+
+    def trace(self):
+        # Chrome trace event format: one complete ("X") event per span
+        pid = os.getpid()
+        events = [{"name": s["name"], "ph": "X", "ts": round(s["start"] * 1e6), "dur": round(s["seconds"] * 1e6),
+                   "pid": pid, "tid": s["thread"],
+                   "args": {k: s[k] for k in ("rows", "rss_mb", "peak_rss_mb", "peak_growth_mb", "error") if s[k] is not None}
+                           | s["meta"]}
+                  for s in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, folder, name="perf"):
+        # Returns the path of the JSON file; the trace goes next to it
+        os.makedirs(folder, exist_ok=True)
+        stem = os.path.join(folder, f"{name}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))}-{os.getpid()}")
+        with open(f"{stem}.json", "w") as f:
+            json.dump({"started": self.started, "summary": self.summary(), "spans": self.spans}, f, indent=2, default=str)
+        with open(f"{stem}.trace.json", "w") as f:
+            json.dump(self.trace(), f, default=str)
+        return f"{stem}.json"
+
+    def print_summary(self):
+        for name, st in sorted(self.summary().items(), key=lambda item: -item[1]["seconds"]):
+            rows = f", {st['rows']} rows" if st["rows"] else ""
+            print(f"   {name}: {st['calls']}x, {st['seconds']:.3f}s (max {st['max_seconds']:.3f}s){rows}, "
+                  f"peak +{st['peak_growth_mb']:.0f} MB")
+
+
+class Span:
+    __slots__ = ("recorder", "name", "meta", "rows", "_start", "_peak", "_depth")
+
+    def __init__(self, recorder, name, meta):
+        self.recorder = recorder
+        self.name = name
+        self.meta = meta
+        self.rows = None
+
+    def __enter__(self):
+        stack = _stack()
+        self._depth = len(stack)
+        stack.append(self)
+        self._peak = peak_rss_mb()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _stack().pop()
+        peak = peak_rss_mb()
+        self.recorder.add({
+            "name": self.name, "depth": self._depth, "start": round(self._start - self.recorder.origin, 6),
+            "seconds": round(end - self._start, 6), "rows": self.rows, "rss_mb": rss_mb(), "peak_rss_mb": peak,
+            "peak_growth_mb": None if peak is None else round(peak - self._peak, 1),
+            "thread": threading.get_ident(), "meta": self.meta, "error": exc_type.__name__ if exc_type else None,
+        })
+        return False
+
+
+class _NoSpan:
+    # Shared by every span while nothing records; rows set on it are never read
+    def __init__(self):
+        self.rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+_local = threading.local()
+_default = None  # process-wide recorder (PERF_TRACE or enable())
+_per_thread = False  # whether activate() was ever called, so the disabled path skips the thread-local lookup
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name, **meta):
+    if _default is None and not _per_thread:
+        return _NO_SPAN
+    recorder = getattr(_local, "recorder", None) or _default
+    if recorder is None:
+        return _NO_SPAN
+    return Span(recorder, name, meta)
+
+
+def timed(name=None):
+    # Decorator form of span()
+    def wrap(func):
+        label = name or func.__qualname__
+
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        wrapper.__name__, wrapper.__qualname__, wrapper.__doc__ = func.__name__, func.__qualname__, func.__doc__
+        return wrapper
+    return wrap
+
+
+def activate(recorder):
+    # Spans of this thread only go to recorder (None: back to the process-wide one, if any)
+    global _per_thread
+    _per_thread = _per_thread or recorder is not None
+    _local.recorder = recorder
+
+
+def enabled():
+    return (getattr(_local, "recorder", None) or _default) is not None
+
+
+def enable(folder=None, name=None):
+    # Records every thread of the process; with a folder the spans are exported at exit
+    global _default
+    _default = Recorder()
+    if folder:
+        name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0].lstrip("-") or "python"
+        atexit.register(_export_at_exit, _default, folder, name)
+    return _default
+
+
+def _export_at_exit(recorder, folder, name):
+    if not recorder.spans:
+        return
+    print("--- Performance ---")
+    recorder.print_summary()
+    print(f"Performance trace written to {recorder.export(folder, name)}")
+
+
+if os.environ.get("PERF_TRACE"):
+    enable(os.environ["PERF_TRACE"])
@@ -0,0 +1,105 @@
+import argparse
+import gc
+
+import pandas as pd
+
+from sentiment_cache import SentimentCache, score_with_cache, text_hash
+from sentiment_engine import run_batched
+from sentiment_models import MODEL_OPTIONS, cache_key, load_pipeline
+from storage import read_table, write_table
+
+# Scores live next to the reviews, one Sentiment/Confidence column pair per model
+SENTIMENT_TABLE = "review_sentiment"
+
+
+def model_slug(model_name):
+    # "RoBERTa (Accurate)" -> "roberta"
+    return model_name.split()[0].lower()
+
+
+def sentiment_columns(model_name):
+    slug = model_slug(model_name)
+    return f"Sentiment_{slug}", f"Confidence_{slug}"
+
+
+def _rows_to_score(reviews_df, stored_df, model_name):
+    # New reviews, reviews whose text changed since they were scored, and reviews this model never saw
+    sentiment_col, _ = sentiment_columns(model_name)
+    if stored_df.empty or sentiment_col not in stored_df:
+        return reviews_df.index
+    stored = stored_df.drop_duplicates('rid').set_index('rid')
+    same_text = reviews_df['rid'].map(stored['Text_Hash']) == reviews_df['Text_Hash']
+    scored = reviews_df['rid'].map(stored[sentiment_col]).notna()
+    return reviews_df.index[~(same_text & scored)]
+
+
+def precompute_sentiment(model_names=None, store=None):
+    model_names = model_names or list(MODEL_OPTIONS.keys())
+
+    reviews_df = read_table("reviews", columns=["rid", "Review_Text"], store=store)
+    reviews_df['Text_Hash'] = reviews_df['Review_Text'].astype(str).map(text_hash)
+    stored_df = read_table(SENTIMENT_TABLE, store=store)
+
+    # Start from what is stored for the current rids, so unchanged scores are kept
+    out_df = reviews_df[['rid', 'Text_Hash']].copy()
+    if not stored_df.empty:
+        keep = stored_df.drop(columns=['Text_Hash']).drop_duplicates('rid').set_index('rid')
+        out_df = out_df.join(keep, on='rid')
+
+    cache = SentimentCache()
+    for model_name in model_names:
+        sentiment_col, confidence_col = sentiment_columns(model_name)
+        todo = _rows_to_score(reviews_df, stored_df, model_name)
+        print(f"--- {model_name}: {len(todo)} of {len(reviews_df)} reviews to score ---")
+        if len(todo) == 0:
+            continue
+
+        # Loaded one at a time and released, so ingest never holds all models at once
+        pipe = None
+        def _pipe(texts):
+            nonlocal pipe
+            if pipe is None:
+                pipe = load_pipeline(MODEL_OPTIONS[model_name])
+            return run_batched(pipe, texts)
+
+        results, hits = score_with_cache(_pipe, cache_key(MODEL_OPTIONS[model_name]),
+                                   reviews_df.loc[todo, 'Review_Text'].tolist(), cache)
+        if sentiment_col not in out_df:
+            out_df[sentiment_col] = None
+            out_df[confidence_col] = float("nan")
+        out_df.loc[todo, sentiment_col] = [r['sentiment'] for r in results]
+        out_df.loc[todo, confidence_col] = [r['score'] for r in results]
+        print(f"   {hits} from the cache, {len(todo) - hits} scored")
+
+        pipe = None
+        gc.collect()
+
+    # The store swaps the table atomically, so the dashboard never reads a half-written one
+    write_table(SENTIMENT_TABLE, out_df, store=store)
+    print(f"SUCCESS: Saved sentiment for {len(out_df)} reviews")
+
+    # The fact table carries these scores too
+    from review_facts import build_facts
+    build_facts(store)
+    return out_df
+
+
+def apply_precomputed(reviews_df, stored_df, model_name):
+    # Returns Sentiment/Confidence aligned to reviews_df, NaN where the row still needs live inference
+    sentiment_col, confidence_col = sentiment_columns(model_name)
+    empty = pd.Series(index=reviews_df.index, dtype=object), pd.Series(index=reviews_df.index, dtype=float)
+    if stored_df.empty or sentiment_col not in stored_df or reviews_df.empty:
+        return empty
+
+    stored = stored_df.dropna(subset=[sentiment_col]).drop_duplicates('rid').set_index('rid')
+    same_text = reviews_df['rid'].map(stored['Text_Hash']) == reviews_df['Review_Text'].astype(str).map(text_hash)
+    sentiment = reviews_df['rid'].map(stored[sentiment_col]).where(same_text)
+    confidence = reviews_df['rid'].map(stored[confidence_col]).where(same_text)
+    return sentiment, confidence
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score new reviews with every configured model")
+    parser.add_argument("--models", nargs="*", choices=list(MODEL_OPTIONS.keys()), default=None)
+    args = parser.parse_args()
+    precompute_sentiment(args.models)
@@ -0,0 +1,204 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import perf
+from precompute_sentiment import apply_precomputed, model_slug
+from review_facts import FACT_TABLE, UNLINKED, build_facts_frame
+from sentiment_cache import SentimentCache, score_with_cache
+from sentiment_engine import run_batched
+from sentiment_models import MODEL_OPTIONS, cache_key, load_pipeline
+
+# The Intelligence Report without Streamlit: scoring (precomputed -> cache -> model), product
+# sentiment summary, top/bottom rankings and stars-vs-sentiment anomalies, aggregated over the
+# review_facts table. The Reviews page and the CLI (e.g. a nightly run over the whole history)
+# both go through here.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR = os.path.join(script_dir, "data", "reports")
+NEG_RATIO_THRESHOLD = 0.4 # products at or above this share of negative reviews need improvement
+MIN_SHARDED = 512         # below this many texts, starting worker processes costs more than it saves
+SHARDS_PER_WORKER = 4     # smaller shards even out workers that drew the longer reviews
+
+
+# --- SCORING ---
+_worker = {}
+
+def _init_worker(model_id, threads):
+    # Every worker gets its own share of the cores, so N workers never run N x all-cores threads
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _worker["threads"] = threads
+    _worker["pipe"] = load_pipeline(model_id)
+
+
+def _score_shard(texts):
+    return run_batched(_worker["pipe"], texts, num_threads=_worker["threads"])
+
+
+def score_sharded(texts, model_name, workers, cores=None):
+    # Splits the texts over a pool of worker processes, each with the model loaded once
+    cores = cores or os.cpu_count() or 1
+    threads = max(1, cores // workers)
+    size = -(-len(texts) // (workers * SHARDS_PER_WORKER))
+    shards = [texts[i:i + size] for i in range(0, len(texts), size)]
+    print(f"   Scoring {len(texts)} reviews in {len(shards)} shards on {workers} workers x {threads} threads")
+    # spawn: a forked copy of a process that already runs torch threads can deadlock
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(MODEL_OPTIONS[model_name], threads)) as pool:
+        return [r for part in pool.map(_score_shard, shards) for r in part]
+
+
+def score_reviews(reviews_df, model_name, stored=None, cache=None, get_pipe=None, workers=1):
+    # Returns a copy with Sentiment/Confidence and how many rows came from each source
+    model_id = MODEL_OPTIONS[model_name]
+    scored = reviews_df.copy()
+    if stored is not None:
+        with perf.span("sentiment.precomputed", model=model_name) as s:
+            scored['Sentiment'], scored['Confidence'] = apply_precomputed(scored, stored, model_name)
+            s.rows = len(scored)
+    else:
+        scored['Sentiment'], scored['Confidence'] = None, float("nan")
+    todo = scored.index[scored['Sentiment'].isna()]
+
+    cache = cache or SentimentCache()
+    get_pipe = get_pipe or (lambda: load_pipeline(model_id))
+    cached = 0
+    if len(todo):
+        def scorer(texts):
+            if workers > 1 and len(texts) >= MIN_SHARDED:
+                return score_sharded(texts, model_name, workers)
+            return run_batched(get_pipe(), texts)
+
+        with perf.span("sentiment.inference", model=model_name) as s:
+            results, cached = score_with_cache(scorer, cache_key(model_id), scored.loc[todo, 'Review_Text'].tolist(), cache)
+            results = pd.DataFrame(results)
+            s.rows = len(todo)
+        scored.loc[todo, 'Sentiment'] = results['sentiment'].to_numpy()
+        scored.loc[todo, 'Confidence'] = results['score'].to_numpy()
+
+    counts = {"precomputed": len(scored) - len(todo), "cached": cached, "live": len(todo) - cached}
+    return scored, counts
+
+
+# --- REPORT TABLES ---
+def product_summary(titles, counts):
+    # counts: [NEGATIVE, POSITIVE] per product; equal titles become one row, products never scored are left out
+    stats = pd.DataFrame({"NEGATIVE": counts[:, 0], "POSITIVE": counts[:, 1]}, dtype="int64")
+    scored = (stats["NEGATIVE"] + stats["POSITIVE"] > 0).to_numpy()
+    stats = stats[scored].groupby(pd.Index(titles[scored], name="Title")).sum()
+    stats.columns.name = "Sentiment"
+    stats["Total"] = stats["POSITIVE"] + stats["NEGATIVE"]
+    stats["Neg_Ratio"] = stats["NEGATIVE"] / stats["Total"]
+    return stats
+
+
+@perf.timed("report.aggregate")
+def build_report(scored_df, facts, threshold=NEG_RATIO_THRESHOLD):
+    # facts: the review_facts table (one row per review-product link); scored_df: reviews with Sentiment.
+    # Labels are compared once as integer codes and every table below is a mask or a bincount over them.
+    codes, names = pd.factorize(scored_df['Sentiment'])
+    names = list(names)
+    positive = codes == (names.index("POSITIVE") if "POSITIVE" in names else -2)
+    negative = codes == (names.index("NEGATIVE") if "NEGATIVE" in names else -2)
+
+    # Fact rows of the scored reviews; reviews newer than the last fact-table build count as unlinked (pid -1)
+    first = np.flatnonzero(~scored_df['rid'].duplicated().to_numpy())
+    at = pd.Index(scored_df['rid'].to_numpy()[first]).get_indexer(facts['rid'])
+    linked = np.flatnonzero(at >= 0)
+    covered = np.zeros(len(first), dtype=bool)
+    covered[at[linked]] = True
+    newer = np.flatnonzero(~covered)
+    rows = first[np.concatenate([at[linked], newer])]
+    fact_pids = facts['pid'].to_numpy(dtype="int64", na_value=-1)[linked]
+    pids = np.concatenate([fact_pids, np.full(len(newer), -1, dtype="int64")])
+
+    # One bincount over (product, label) pairs on integer pids, then a title per product
+    product, pid_keys = pd.factorize(pids)
+    counts = np.bincount(product * 2 + positive[rows], weights=positive[rows] | negative[rows],
+                         minlength=2 * len(pid_keys)).reshape(-1, 2)
+    one_row = np.zeros(len(pid_keys), dtype="int64")
+    one_row[product[:len(linked)]] = linked
+    titles = np.full(len(pid_keys), UNLINKED, dtype=object)
+    has_pid = pid_keys != -1
+    titles[has_pid] = facts['Title'].take(one_row[has_pid]).to_numpy(dtype=object)
+    product_stats = product_summary(titles, counts)
+
+    # The "Unlinked Reviews" placeholder is left out of the rankings
+    ranked = product_stats[product_stats.index != UNLINKED]
+    stars = pd.to_numeric(scored_df['Stars'], errors='coerce').to_numpy()
+    near_conf = facts['Match_Confidence'].to_numpy()[linked][(facts['Match_Method'].to_numpy()[linked] == "near")] \
+        if "Match_Method" in facts else np.array([])
+    return {
+        "product_stats": product_stats,
+        "top_rated": ranked[ranked['Neg_Ratio'] < threshold].sort_values(by='POSITIVE', ascending=False),
+        "needs_improvement": ranked[ranked['Neg_Ratio'] >= threshold].sort_values(by='Neg_Ratio', ascending=False),
+        # Low stars (1-3) but positive text, high stars (4-5) but negative text
+        "anomalies_low_stars_positive": scored_df[(stars <= 3) & positive],
+        "anomalies_high_stars_negative": scored_df[(stars >= 4) & negative],
+        "near_links": len(near_conf),
+        "near_min_confidence": float(near_conf.min()) if len(near_conf) else None,
+    }
+
+
+def write_report(report, scored_df, folder, extra=None):
+    os.makedirs(folder, exist_ok=True)
+    scored_df.to_csv(os.path.join(folder, "scored_reviews.csv"), index=False)
+    summary = dict(extra or {})
+    for name, value in report.items():
+        if isinstance(value, pd.DataFrame):
+            value.to_csv(os.path.join(folder, f"{name}.csv"), index=name in ("product_stats", "top_rated", "needs_improvement"))
+            summary[name] = len(value)
+        else:
+            summary[name] = value
+    with open(os.path.join(folder, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+    return summary
+
+
+def run_report(model_names=None, month=None, workers=None, out_dir=REPORT_DIR):
+    from storage import read_table, reviews_in_month
+
+    model_names = model_names or list(MODEL_OPTIONS.keys())
+    workers = workers or os.cpu_count() or 1
+    if month:
+        year, month_num = (int(x) for x in month.split("-"))
+        reviews = reviews_in_month(year, month_num)
+    else:
+        reviews = read_table("reviews")
+    # The fact table holds both the stored scores and the product of every review
+    facts = read_table(FACT_TABLE)
+    if facts.empty:
+        facts = build_facts_frame(reviews if not month else read_table("reviews"), read_table("product_reviews"),
+                                  read_table("products"), read_table("review_sentiment"))
+    cache = SentimentCache()
+
+    for model_name in model_names:
+        print(f"--- {model_name}: {len(reviews)} reviews ({month or 'full history'}) ---")
+        start = time.perf_counter()
+        scored, counts = score_reviews(reviews, model_name, facts, cache, workers=workers)
+        report = build_report(scored, facts)
+        folder = os.path.join(out_dir, month or "all", model_slug(model_name))
+        summary = write_report(report, scored, folder, {"model": model_name, "month": month or "all",
+                                                        "reviews": len(scored), **counts,
+                                                        "seconds": round(time.perf_counter() - start, 2)})
+        print(f"   {counts['precomputed']} precomputed, {counts['cached']} cached, {counts['live']} scored live; "
+              f"{summary['needs_improvement']} products need improvement -> {folder}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the Intelligence Report tables for one month or the full history")
+    parser.add_argument("--models", nargs="*", choices=list(MODEL_OPTIONS.keys()), default=None, help="Default: every model")
+    parser.add_argument("--month", default=None, help="YYYY-MM; default: the full history")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: one per core)")
+    parser.add_argument("--out", default=REPORT_DIR, help="Folder for the report tables")
+    args = parser.parse_args()
+    run_report(args.models, args.month, args.workers, args.out)
@@ -0,0 +1,49 @@
+import argparse
+
+from precompute_sentiment import SENTIMENT_TABLE
+from sentiment_cache import text_hash
+from storage import read_table, write_table
+
+# Materialized review x product fact table: every review with the product(s) it belongs to and
+# the stored sentiment of every model, so a report is a filter plus one aggregation instead of
+# merging products, product_reviews and reviews on every run. Rebuilt at ingest.
+FACT_TABLE = "review_facts"
+UNLINKED = "Unlinked Reviews"
+
+
+def build_facts_frame(reviews, product_reviews, products, sentiment=None):
+    facts = reviews[["rid", "Date", "Stars"]].copy()
+    facts["Text_Hash"] = reviews["Review_Text"].astype(str).map(text_hash)
+
+    links = product_reviews.dropna(subset=["rid"]).copy()
+    links["rid"] = links["rid"].astype("int64")
+    link_cols = [c for c in ("pid", "rid", "Match_Method", "Match_Confidence") if c in links]
+    facts = facts.merge(links[link_cols].drop_duplicates(["rid", "pid"]), on="rid", how="left")
+    facts = facts.merge(products[["pid", "Title"]].drop_duplicates("pid"), on="pid", how="left")
+    facts["pid"] = facts["pid"].astype("Int64")
+    facts["Title"] = facts["Title"].fillna(UNLINKED)
+
+    # Only scores of the text as it is now; a review edited since scoring is left empty
+    if sentiment is not None and not sentiment.empty:
+        stored = sentiment.drop_duplicates("rid").set_index("rid")
+        current = facts["rid"].map(stored["Text_Hash"]) == facts["Text_Hash"]
+        for col in stored.columns.drop("Text_Hash"):
+            facts[col] = facts["rid"].map(stored[col]).where(current)
+    return facts.sort_values(["Date", "rid"], kind="stable").reset_index(drop=True)
+
+
+def build_facts(store=None):
+    facts = build_facts_frame(
+        read_table("reviews", columns=["rid", "Date", "Review_Text", "Stars"], store=store),
+        read_table("product_reviews", store=store),
+        read_table("products", columns=["pid", "Title"], store=store),
+        read_table(SENTIMENT_TABLE, store=store),
+    )
+    write_table(FACT_TABLE, facts, store=store)
+    print(f"SUCCESS: Built {FACT_TABLE} with {len(facts)} rows")
+    return facts
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=f"Rebuild the {FACT_TABLE} table from the stored tables").parse_args()
+    build_facts()
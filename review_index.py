@@ -0,0 +1,51 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+
+class MonthIndex:
+    # Reviews sorted by date once, plus the row range of every (year, month),
+    # so a month is a dict lookup and a slice instead of a scan over all reviews
+    def __init__(self, reviews_df, date_col='Date'):
+        dates = pd.to_datetime(reviews_df[date_col], errors='coerce')
+        # Unparseable dates sort last and belong to no month
+        order = np.argsort(dates.to_numpy(dtype="datetime64[ns]"), kind="stable")
+        self.frame = reviews_df.iloc[order].reset_index(drop=True)
+        sorted_dates = dates.iloc[order].reset_index(drop=True)
+
+        valid = sorted_dates.notna().to_numpy()
+        keys = np.full(len(sorted_dates), -1, dtype="int64")
+        keys[valid] = (sorted_dates[valid].dt.year * 12 + sorted_dates[valid].dt.month - 1).to_numpy()
+
+        self._ranges = {}
+        if valid.any():
+            n_valid = int(valid.sum())
+            starts = np.flatnonzero(np.diff(keys[:n_valid], prepend=-2))
+            stops = np.append(starts[1:], n_valid)
+            for start, stop in zip(starts, stops):
+                year, month0 = divmod(int(keys[start]), 12)
+                self._ranges[(year, month0 + 1)] = (int(start), int(stop))
+
+    def periods(self):
+        # Every month between the first and the last review, including empty ones
+        if not self._ranges:
+            return []
+        (y0, m0), (y1, m1) = min(self._ranges), max(self._ranges)
+        return [(k // 12, k % 12 + 1) for k in range(y0 * 12 + m0 - 1, y1 * 12 + m1)]
+
+    def years(self):
+        return sorted({year for year, _ in self._ranges})
+
+    def month(self, year, month):
+        start, stop = self._ranges.get((year, month), (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def count(self, year, month):
+        start, stop = self._ranges.get((year, month), (0, 0))
+        return stop - start
+
+    @staticmethod
+    def label(period):
+        year, month = period
+        return f"{calendar.month_abbr[month]} {year}"
@@ -0,0 +1,160 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Links product-page reviews to the global reviews table (rid) in two passes:
+#   1. exact: the normalized text (case, quotes, dashes, spacing and punctuation ignored)
+#   2. near-duplicate: MinHash signatures of character shingles, bucketed with LSH bands, so only
+#      reviews sharing a bucket are compared instead of every pair
+SHINGLE = 5           # bytes per shingle, packed losslessly into one uint64
+NUM_PERM = 64         # MinHash signature length
+BANDS = 16            # LSH bands of NUM_PERM // BANDS rows; ~0.8 similarity is found with >99% chance
+NEAR_THRESHOLD = 0.8  # shingle Jaccard needed for a near-duplicate match
+MAX_BUCKET = 50       # buckets shared by more reviews than this are boilerplate, not evidence
+CHUNK = 500_000       # shingles hashed per step, bounds memory on large tables
+
+_rng = np.random.default_rng(42)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint32) | np.uint32(1)
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint32)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_BAND_MIX = _rng.integers(1, 2**32, NUM_PERM // BANDS, dtype=np.uint64)
+
+
+def match_texts(texts):
+    # What two copies of the same review still have in common after scraping: unicode form,
+    # case, punctuation (straight/curly quotes, dashes) and spacing are all dropped
+    return (pd.Series(texts, dtype=object).astype(str).str.normalize("NFKC").str.casefold()
+            .str.replace(r"[^\w\s]", " ", regex=True).str.replace(r"\s+", " ", regex=True).str.strip()
+            .str.pad(SHINGLE, side="right"))
+
+
+def shingles(text):
+    # Byte shingles of an already matched text
+    data = text.encode("utf-8")
+    return {data[i:i + SHINGLE] for i in range(len(data) - SHINGLE + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _shingle_hashes(encoded):
+    # Every SHINGLE-byte window of the concatenated texts that stays inside one text, as a 32-bit hash
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    windows = np.lib.stride_tricks.sliding_window_view(buf, SHINGLE)
+    packed = np.zeros(len(windows), dtype=np.uint64)
+    for j in range(SHINGLE):
+        packed |= windows[:, j].astype(np.uint64) << np.uint64(8 * j)
+    ends = np.cumsum(lengths)
+    doc = np.repeat(np.arange(len(encoded)), lengths)[:len(windows)]
+    keep = np.arange(len(windows)) + SHINGLE <= ends[doc]
+    return ((packed[keep] * _MIX) >> np.uint64(32)).astype(np.uint32), lengths - SHINGLE + 1
+
+
+def signatures(texts):
+    # Min over each text's shingles of NUM_PERM universal hashes, vectorized over a block of texts
+    # at a time so memory stays bounded by CHUNK shingles
+    encoded = [t.encode("utf-8") for t in texts]
+    sig = np.zeros((len(encoded), NUM_PERM), dtype=np.uint32)
+    start = 0
+    while start < len(encoded):
+        end, total = start, 0
+        while end < len(encoded) and (end == start or total + len(encoded[end]) <= CHUNK):
+            total += len(encoded[end])
+            end += 1
+        hashes, sizes = _shingle_hashes(encoded[start:end])
+        # One row per permutation keeps the reduction on contiguous memory; wraps mod 2**32
+        mixed = _A[:, None] * hashes[None, :] + _B[:, None]
+        sig[start:end] = np.minimum.reduceat(mixed, np.concatenate([[0], np.cumsum(sizes)[:-1]]), axis=1).T
+        start = end
+    return sig
+
+
+def band_keys(sig):
+    # One 64-bit key per (review, band); reviews with an identical band land in the same bucket
+    rows = NUM_PERM // BANDS
+    return (sig.reshape(len(sig), BANDS, rows).astype(np.uint64) * _BAND_MIX).sum(axis=2)
+
+
+def candidate_pairs(query_sig, index_sig):
+    # (query row, index row) pairs sharing at least one band bucket, found with joins instead of loops
+    q_keys, i_keys = band_keys(query_sig), band_keys(index_sig)
+    pairs = []
+    for band in range(BANDS):
+        index = pd.DataFrame({"key": i_keys[:, band], "i": np.arange(len(index_sig))})
+        index = index[index.groupby("key")["key"].transform("size") <= MAX_BUCKET]
+        query = pd.DataFrame({"key": q_keys[:, band], "q": np.arange(len(query_sig))})
+        pairs.append(query.merge(index, on="key")[["q", "i"]])
+    return pd.concat(pairs, ignore_index=True).drop_duplicates() if pairs else pd.DataFrame(columns=["q", "i"])
+
+
+def link_reviews(product_reviews, reviews, threshold=NEAR_THRESHOLD):
+    # Returns rid, Match_Confidence (1.0 exact, Jaccard for near matches) and Match_Method per product review
+    out = pd.DataFrame({"rid": pd.array([pd.NA] * len(product_reviews), dtype="Int64"),
+                        "Match_Confidence": np.nan, "Match_Method": None}, index=product_reviews.index)
+    if product_reviews.empty or reviews.empty:
+        return out
+
+    # 1. Exact match on the matched text
+    review_text = match_texts(reviews["Review_Text"].to_numpy())
+    query_text = match_texts(product_reviews["Review_Text"].to_numpy())
+    rid_by_text = pd.Series(reviews["rid"].to_numpy(), index=review_text.to_numpy())
+    exact = query_text.map(rid_by_text[~rid_by_text.index.duplicated(keep="last")])
+    found = exact.notna().to_numpy()
+    out.loc[found, "rid"] = exact[found].astype("int64").to_numpy()
+    out.loc[found, "Match_Confidence"] = 1.0
+    out.loc[found, "Match_Method"] = "exact"
+
+    # 2. Near duplicates for whatever is left
+    rest = query_text[~found]
+    if rest.empty:
+        return out
+    pairs = candidate_pairs(signatures(rest), signatures(review_text))
+    if pairs.empty:
+        return out
+    # Candidates are verified on their real shingle overlap
+    q_sh = {q: shingles(rest.iat[q]) for q in pairs["q"].unique()}
+    i_sh = {i: shingles(review_text.iat[i]) for i in pairs["i"].unique()}
+    pairs["score"] = [jaccard(q_sh[q], i_sh[i]) for q, i in zip(pairs["q"], pairs["i"])]
+    best = pairs[pairs["score"] >= threshold].sort_values("score", ascending=False).drop_duplicates("q")
+
+    labels = product_reviews.index[~found][best["q"].to_numpy()]
+    out.loc[labels, "rid"] = reviews["rid"].to_numpy()[best["i"].to_numpy()]
+    out.loc[labels, "Match_Confidence"] = best["score"].round(3).to_numpy()
+    out.loc[labels, "Match_Method"] = "near"
+    return out
+
+
+def link_summary(linked):
+    methods = linked["Match_Method"].value_counts()
+    return (f"{int(methods.get('exact', 0))} exact, {int(methods.get('near', 0))} near-duplicate "
+            f"(min confidence {linked['Match_Confidence'].min():.2f}), {int(linked['rid'].isna().sum())} unlinked")
+
+
+def link_stored(store=None, threshold=NEAR_THRESHOLD):
+    # Relinks the stored product_reviews table; None if either table is still empty
+    from storage import read_table, write_table
+
+    product_reviews = read_table("product_reviews", columns=["pid", "Review_Text"], store=store)
+    reviews = read_table("reviews", columns=["rid", "Review_Text"], store=store)
+    if product_reviews.empty or reviews.empty:
+        return None
+    linked = link_reviews(product_reviews, reviews, threshold)
+    write_table("product_reviews", product_reviews.join(linked), store=store)
+    return linked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Link product-page reviews to global review ids")
+    parser.add_argument("--threshold", type=float, default=NEAR_THRESHOLD, help="Shingle Jaccard for a near-duplicate match")
+    args = parser.parse_args()
+
+    linked = link_stored(threshold=args.threshold)
+    if linked is None:
+        print("Error: Make sure products reviews and global reviews were scraped first.")
+    else:
+        print(f"SUCCESS: {link_summary(linked)}")
+        from review_facts import build_facts
+        build_facts()
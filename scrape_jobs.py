@@ -0,0 +1,179 @@
+import collections
+import json
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+
+# Background scrape jobs: the scraper scripts run as child processes fed by a reader thread,
+# so a Streamlit run never blocks on a crawl. Their per-page log lines become progress counts,
+# a lock file keeps two sessions (or two servers) from scraping at once, and a job can be cancelled.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+LOCK_PATH = os.path.join(script_dir, "data", ".scrape.lock")
+LOG_LINES = 200
+CANCEL_GRACE = 5 # seconds a cancelled scraper gets to quit its browsers before it is killed
+
+# Lines the scrapers print as they go
+_stage = re.compile(r"^--- (.+?) ---")
+_page = re.compile(r"^\s*(\w+) page (\d+): (\d+) (?:items|products)")
+_so_far = re.compile(r"^\s*(\w+): (\d+) so far")
+_mapped = re.compile(r"^\s*Mapping pid (\d+)")
+
+
+class ScrapeLock:
+    # A file created with O_EXCL; a lock left by a process that no longer exists is taken over
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+
+    def holder(self):
+        try:
+            with open(self.path) as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return info if _alive(info.get("pid")) else None
+
+    def acquire(self, label):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self.holder() is not None:
+                    return False
+                # Stale lock from a crashed server
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"pid": os.getpid(), "label": label, "started": time.time()}, f)
+            return True
+        return False
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
+
+
+class ScrapeJob:
+    def __init__(self, label, commands, on_finish=None):
+        self.label = label
+        self.commands = commands
+        self.on_finish = on_finish
+        self.state = "running" # running / done / failed / cancelled
+        self.stage = "Starting"
+        self.counts = {}
+        self.lines = collections.deque(maxlen=LOG_LINES)
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self._process = None
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        try:
+            for cmd in self.commands:
+                if self._cancelled.is_set():
+                    break
+                self.stage = os.path.basename(cmd[1]) if len(cmd) > 1 else cmd[0]
+                flags = subprocess.CREATE_NEW_PROCESS_GROUP if os.name == "nt" else 0
+                self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                                 bufsize=1, env=env, cwd=script_dir, creationflags=flags)
+                for line in self._process.stdout:
+                    self._parse(line.rstrip())
+                if self._process.wait() != 0 and not self._cancelled.is_set():
+                    raise RuntimeError(f"{os.path.basename(cmd[1])} exited with code {self._process.returncode}")
+            state = "cancelled" if self._cancelled.is_set() else "done"
+        except Exception as e:
+            state, self.error = "failed", str(e)
+        self.finished = time.time()
+        # on_finish runs first, so whoever sees the job end also sees the new data
+        if self.on_finish:
+            self.on_finish(self)
+        self.state = state
+
+    def _parse(self, line):
+        self.lines.append(line)
+        if m := _stage.match(line):
+            self.stage = m.group(1)
+        elif m := _page.match(line):
+            c = self.counts.setdefault(m.group(1), {"pages": 0, "items": 0})
+            c["pages"], c["items"] = c["pages"] + 1, c["items"] + int(m.group(3))
+        elif m := _so_far.match(line):
+            self.counts.setdefault(m.group(1), {"pages": 0, "items": 0})["items"] = int(m.group(2))
+        elif _mapped.match(line):
+            c = self.counts.setdefault("product pages", {"pages": 0, "items": 0})
+            c["pages"] += 1
+
+    def cancel(self):
+        self._cancelled.set()
+        proc = self._process
+        if proc is not None and proc.poll() is None:
+            # Ctrl+C lets the scrapers' finally blocks quit their browsers
+            proc.send_signal(signal.CTRL_BREAK_EVENT if os.name == "nt" else signal.SIGINT)
+            try:
+                proc.wait(CANCEL_GRACE)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    @property
+    def running(self):
+        return self.state == "running"
+
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+
+class JobRunner:
+    # One per server; the data versions shown stay pinned to the pre-scrape snapshot while a job
+    # writes, so a page never mixes freshly scraped tables with old ones
+    def __init__(self, versions, lock=None):
+        self.versions = versions # () -> {table: version}
+        self.lock = lock or ScrapeLock()
+        self.job = None
+        self._pinned = None
+        self._mutex = threading.Lock()
+
+    def start(self, label, commands):
+        with self._mutex:
+            if self.job is not None and self.job.running:
+                return None
+            if not self.lock.acquire(label):
+                return None
+            self._pinned = self.versions()
+            self.job = ScrapeJob(label, commands, on_finish=self._finished).start()
+            return self.job
+
+    def _finished(self, job):
+        self.lock.release()
+        with self._mutex:
+            # Every table switches to its new version at once
+            self._pinned = None
+
+    def busy_elsewhere(self):
+        # A scrape started from another server process sharing the data folder
+        running_here = self.job is not None and self.job.running
+        return None if running_here else self.lock.holder()
+
+    def data_versions(self):
+        return self._pinned if self._pinned is not None else self.versions()
@@ -0,0 +1,193 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import pandas as pd
+
+# Default location of the cache (next to the scraped CSVs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.path.join(script_dir, "data", "sentiment_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 200_000
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    # Same review scraped twice can differ in unicode form or spacing only
+    text = unicodedata.normalize("NFKC", str(text))
+    return _whitespace.sub(" ", text).strip()
+
+
+def text_hash(text):
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def normalize_label(label):
+    # Maps every model's raw label onto POSITIVE / NEGATIVE
+    label = str(label).upper()
+    return "POSITIVE" if any(x in label for x in ['POS', '4', '5', 'LABEL_1']) else "NEGATIVE"
+
+
+# Raw label -> POSITIVE / NEGATIVE of every configured model, so a batch is mapped with one lookup
+LABEL_MAPS = {
+    "distilbert-base-uncased-finetuned-sst-2-english": {"POSITIVE": "POSITIVE", "NEGATIVE": "NEGATIVE"},
+    "cardiffnlp/twitter-roberta-base-sentiment-latest": {"POSITIVE": "POSITIVE", "NEUTRAL": "NEGATIVE",
+                                                         "NEGATIVE": "NEGATIVE"},
+    "nlptown/bert-base-multilingual-uncased-sentiment": {"1 STAR": "NEGATIVE", "2 STARS": "NEGATIVE",
+                                                         "3 STARS": "NEGATIVE", "4 STARS": "POSITIVE",
+                                                         "5 STARS": "POSITIVE"},
+}
+
+
+def normalize_labels(labels, model_id=None):
+    # Vectorized normalize_label: the model's table first, the substring rule only for unseen labels
+    upper = pd.Series(labels, dtype=object).astype(str).str.upper()
+    table = dict(LABEL_MAPS.get(model_id.split("#")[0], {})) if model_id else {}
+    table.update({label: normalize_label(label) for label in upper.unique() if label not in table})
+    return upper.map(table)
+
+
+class SentimentCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        # Streamlit serves sessions from several threads, so one shared connection + lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment (
+                model_id   TEXT NOT NULL,
+                text_hash  TEXT NOT NULL,
+                label      TEXT NOT NULL,
+                sentiment  TEXT NOT NULL,
+                score      REAL NOT NULL,
+                last_used  REAL NOT NULL,
+                PRIMARY KEY (model_id, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_last_used ON sentiment (last_used)")
+        self._conn.commit()
+
+    # --- LOOKUPS ---
+    def get_many(self, model_id, texts):
+        # Returns {position: result} for every text already scored by this model; its length is this
+        # call's hit count (hits/misses are lifetime totals shared by every session)
+        hashes = [text_hash(t) for t in texts]
+        found = {}
+        with self._lock:
+            unique = list(set(hashes))
+            rows = {}
+            # SQLite caps the number of bound parameters per statement
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for h, label, sentiment, score in self._conn.execute(
+                    f"SELECT text_hash, label, sentiment, score FROM sentiment "
+                    f"WHERE model_id = ? AND text_hash IN ({marks})", [model_id] + chunk
+                ):
+                    rows[h] = {"label": label, "sentiment": sentiment, "score": score}
+
+            if rows:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE sentiment SET last_used = ? WHERE model_id = ? AND text_hash = ?",
+                    [(now, model_id, h) for h in rows]
+                )
+                self._conn.commit()
+
+            for i, h in enumerate(hashes):
+                if h in rows:
+                    found[i] = rows[h]
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, model_id, texts, results):
+        now = time.time()
+        sentiments = normalize_labels([r['label'] for r in results], model_id)
+        records = [
+            (model_id, text_hash(t), r['label'], s, float(r['score']), now)
+            for t, r, s in zip(texts, results, sentiments)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?, ?, ?, ?)", records
+            )
+            self._evict()
+            self._conn.commit()
+
+    # --- SIZE BOUND & INVALIDATION ---
+    def _evict(self):
+        # Drops the least recently used rows once the cache is over its bound
+        count = self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM sentiment WHERE rowid IN "
+                "(SELECT rowid FROM sentiment ORDER BY last_used LIMIT ?)", (overflow,)
+            )
+
+    def invalidate(self, model_id=None):
+        with self._lock:
+            if model_id is None:
+                self._conn.execute("DELETE FROM sentiment")
+            else:
+                self._conn.execute("DELETE FROM sentiment WHERE model_id = ?", (model_id,))
+            self._conn.commit()
+
+    def prune_models(self, valid_model_ids):
+        # Entries of models that were swapped out of MODEL_OPTIONS can never be hit again
+        valid = list(valid_model_ids)
+        marks = ",".join("?" * len(valid))
+        with self._lock:
+            self._conn.execute(f"DELETE FROM sentiment WHERE model_id NOT IN ({marks})", valid)
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def score_with_cache(pipe, model_id, texts, cache):
+    # Only reviews that were never scored by this model reach the pipeline.
+    # Returns (results, how many of them came from the cache)
+    texts = [str(t) for t in texts]
+    found = cache.get_many(model_id, texts)
+    hits = len(found)
+    missing = [i for i in range(len(texts)) if i not in found]
+
+    if missing:
+        # Duplicate texts inside one request are scored once
+        unique = {}
+        for i in missing:
+            unique.setdefault(normalize_text(texts[i]), texts[i])
+        new_texts = list(unique.values())
+        new_results = pipe(new_texts)
+        cache.put_many(model_id, new_texts, new_results)
+        sentiments = normalize_labels([r['label'] for r in new_results], model_id)
+        by_text = {normalize_text(t): {"label": r['label'], "sentiment": s, "score": float(r['score'])}
+                   for t, r, s in zip(new_texts, new_results, sentiments)}
+        for i in missing:
+            found[i] = by_text[normalize_text(texts[i])]
+
+    return [found[i] for i in range(len(texts))], hits
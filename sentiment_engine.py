@@ -0,0 +1,118 @@
+import argparse
+import contextlib
+import os
+import time
+
+# Settings for the CPU-only hosts, overridable from the environment
+DEFAULT_BATCH_SIZE = int(os.environ.get("SENTIMENT_BATCH_SIZE", 16))
+DEFAULT_MAX_LENGTH = int(os.environ.get("SENTIMENT_MAX_LENGTH", 512))
+DEFAULT_THREADS = int(os.environ.get("SENTIMENT_THREADS", 0)) or None
+
+# A batch never mixes texts from different buckets, so short reviews are not padded to long ones
+BUCKET_EDGES = (32, 64, 128, 256, 512)
+
+
+def effective_max_length(pipe, max_length=DEFAULT_MAX_LENGTH):
+    # Some tokenizers report a huge placeholder instead of the real model limit
+    model_limit = getattr(pipe.tokenizer, "model_max_length", max_length) or max_length
+    return min(max_length, model_limit)
+
+
+def token_lengths(tokenizer, texts, max_length):
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def make_batches(lengths, batch_size):
+    # Sort by length, then cut into batches that stay inside one bucket
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, current, current_bucket = [], [], None
+    for i in order:
+        bucket = next((edge for edge in BUCKET_EDGES if lengths[i] <= edge), BUCKET_EDGES[-1])
+        if current and (bucket != current_bucket or len(current) == batch_size):
+            batches.append(current)
+            current = []
+        current.append(i)
+        current_bucket = bucket
+    if current:
+        batches.append(current)
+    return batches
+
+
+def set_threads(num_threads):
+    import torch
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+
+def run_batched(pipe, texts, batch_size=DEFAULT_BATCH_SIZE, max_length=DEFAULT_MAX_LENGTH, num_threads=DEFAULT_THREADS):
+    try:
+        import torch
+    except ImportError:
+        # Pipelines that do not need torch (e.g. the offline stand-in of the benchmarks) run as they are
+        torch = None
+
+    texts = [str(t) for t in texts]
+    if not texts:
+        return []
+
+    if torch:
+        set_threads(num_threads)
+    max_length = effective_max_length(pipe, max_length)
+    lengths = token_lengths(pipe.tokenizer, texts, max_length)
+
+    results = [None] * len(texts)
+    with torch.inference_mode() if torch else contextlib.nullcontext():
+        for batch in make_batches(lengths, batch_size):
+            # Truncation keeps reviews past the model limit from crashing RoBERTa/BERT
+            out = pipe([texts[i] for i in batch], batch_size=len(batch), truncation=True, max_length=max_length)
+            for i, res in zip(batch, out):
+                results[i] = res
+    return results
+
+
+# --- THROUGHPUT REPORT ---
+def measure_throughput(pipe, texts, batch_sizes=(8, 16, 32), max_length=DEFAULT_MAX_LENGTH, num_threads=DEFAULT_THREADS):
+    rows = []
+    # Warm-up so the first measured run does not pay for lazy initialisation
+    run_batched(pipe, texts[:batch_sizes[0]], batch_sizes[0], max_length, num_threads)
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        run_batched(pipe, texts, batch_size, max_length, num_threads)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "batch_size": batch_size,
+            "max_length": max_length,
+            "threads": num_threads or "default",
+            "reviews": len(texts),
+            "seconds": round(elapsed, 3),
+            "reviews_per_sec": round(len(texts) / elapsed, 2) if elapsed else float("inf"),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from sentiment_models import MODEL_OPTIONS, load_pipeline
+
+    parser = argparse.ArgumentParser(description="Reviews/sec per sentiment model on this host")
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reviews.csv"))
+    parser.add_argument("--batch-sizes", default="8,16,32")
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N reviews")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.csv)['Review_Text'].astype(str).tolist()[:args.limit]
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    report = []
+    for name, model_id in MODEL_OPTIONS.items():
+        print(f"--- {name} ---")
+        pipe = load_pipeline(model_id)
+        for row in measure_throughput(pipe, texts, batch_sizes, args.max_length, args.threads):
+            row["model"] = name
+            report.append(row)
+            print(f"   batch={row['batch_size']:>3}  {row['reviews_per_sec']:>8} reviews/sec")
+
+    print(pd.DataFrame(report).to_string(index=False))
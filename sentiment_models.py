@@ -0,0 +1,140 @@
+import argparse
+import gc
+import os
+import re
+import time
+
+from perf import rss_mb
+
+MODEL_OPTIONS = {
+    "DistilBERT (Fast)": "distilbert-base-uncased-finetuned-sst-2-english",
+    "RoBERTa (Accurate)": "cardiffnlp/twitter-roberta-base-sentiment-latest",
+    "BERT (Standard)": "nlptown/bert-base-multilingual-uncased-sentiment"
+}
+
+# pt   = full precision PyTorch (original behaviour)
+# int8 = PyTorch dynamic int8 quantization of the Linear layers
+# onnx = ONNX Runtime export (needs: pip install optimum[onnxruntime])
+BACKENDS = ("pt", "int8", "onnx")
+DEFAULT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "pt")
+
+# Exported / quantized models are built once and reused from here
+script_dir = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.environ.get("SENTIMENT_MODELS_DIR", os.path.join(script_dir, "models"))
+
+
+def cache_key(model_id, backend=DEFAULT_BACKEND):
+    # Quantized models may score slightly differently, so they get their own cache entries
+    return model_id if backend == "pt" else f"{model_id}#{backend}"
+
+
+def artifact_path(model_id, backend):
+    return os.path.join(MODELS_DIR, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', model_id)}-{backend}")
+
+
+def load_pipeline(model_id, backend=DEFAULT_BACKEND):
+    # Imported here so the dashboard starts without loading transformers
+    from transformers import pipeline
+
+    if backend == "pt":
+        # Force PyTorch on CPU
+        return pipeline("sentiment-analysis", model=model_id, framework="pt", device=-1)
+    if backend == "int8":
+        return _load_int8(model_id)
+    if backend == "onnx":
+        return _load_onnx(model_id)
+    raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+
+def _load_int8(model_id):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    path = artifact_path(model_id, "int8") + ".pt"
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    if os.path.exists(path):
+        model = torch.load(path, weights_only=False)
+    else:
+        print(f"Quantizing {model_id} to int8 (one-time)...")
+        model = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        os.makedirs(MODELS_DIR, exist_ok=True)
+        torch.save(model, path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, framework="pt", device=-1)
+
+
+def _load_onnx(model_id):
+    from transformers import AutoTokenizer, pipeline
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        raise ImportError("The 'onnx' backend needs: pip install optimum[onnxruntime]")
+
+    folder = artifact_path(model_id, "onnx")
+    if os.path.exists(os.path.join(folder, "config.json")):
+        model = ORTModelForSequenceClassification.from_pretrained(folder)
+        tokenizer = AutoTokenizer.from_pretrained(folder)
+    else:
+        print(f"Exporting {model_id} to ONNX (one-time)...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model.save_pretrained(folder)
+        tokenizer.save_pretrained(folder)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device=-1)
+
+
+# --- ACCURACY VS FP32 CHECK ---
+def _timed_run(model_id, backend, texts):
+    from sentiment_cache import normalize_label
+    from sentiment_engine import run_batched
+
+    gc.collect()
+    rss_before = rss_mb()
+    pipe = load_pipeline(model_id, backend)
+    rss_model = rss_mb() - rss_before
+
+    start = time.perf_counter()
+    results = run_batched(pipe, texts)
+    elapsed = time.perf_counter() - start
+
+    del pipe
+    gc.collect()
+    return [normalize_label(r['label']) for r in results], [r['score'] for r in results], elapsed, rss_model
+
+
+def compare_backend(model_id, backend, texts):
+    ref_labels, ref_scores, ref_time, ref_rss = _timed_run(model_id, "pt", texts)
+    labels, scores, elapsed, rss = _timed_run(model_id, backend, texts)
+
+    agree = sum(a == b for a, b in zip(ref_labels, labels))
+    return {
+        "backend": backend,
+        "label_agreement": agree / len(texts) if texts else 1.0,
+        "mean_score_diff": sum(abs(a - b) for a, b in zip(ref_scores, scores)) / len(texts) if texts else 0.0,
+        "fp32_sec": round(ref_time, 3),
+        "backend_sec": round(elapsed, 3),
+        "fp32_rss_mb": round(ref_rss, 1),
+        "backend_rss_mb": round(rss, 1),
+    }
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Build the quantized/ONNX models and compare them against fp32")
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "pt"], default="int8")
+    parser.add_argument("--csv", default=os.path.join(script_dir, "data", "reviews.csv"))
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.csv)['Review_Text'].astype(str).tolist()
+
+    report = []
+    for name, model_id in MODEL_OPTIONS.items():
+        print(f"--- {name}: fp32 vs {args.backend} ---")
+        row = compare_backend(model_id, args.backend, texts)
+        row["model"] = name
+        report.append(row)
+        print(f"   labels agree on {row['label_agreement']:.1%} of {len(texts)} reviews")
+
+    print(pd.DataFrame(report).to_string(index=False))
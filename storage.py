@@ -0,0 +1,412 @@
+import argparse
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(script_dir, "data")
+
+# csv     = the original data/*.csv files
+# sqlite  = data/store.sqlite, indexed on rid / pid / Date (default)
+# parquet = data/parquet/*.parquet, sorted on the key so row-group stats prune reads (needs pyarrow)
+BACKENDS = ("csv", "sqlite", "parquet")
+DEFAULT_BACKEND = os.environ.get("DATA_BACKEND", "sqlite")
+
+# store.sqlite and data/parquet/ are not committed, the CSVs are: writes of these tables through the
+# default store also refresh data/<table>.csv, so a deploy from git starts from the latest scrape
+# and precomputed sentiment (imported into its empty store on first read). DATA_CSV_EXPORT=0 turns it off.
+CSV_EXPORT = os.environ.get("DATA_CSV_EXPORT", "1") != "0"
+CSV_EXPORT_TABLES = ("products", "reviews", "testimonials", "product_reviews", "review_sentiment", "review_facts")
+
+# Typed schema of every table; None means the columns are decided by the writer
+TABLES = {
+    "products": {
+        # Link: the detail page, what identifies a product across scrapes (titles repeat)
+        "columns": {"pid": "int", "Title": "str", "Description": "str", "Price": "str", "Link": "str"},
+        "key": ["pid"], "indexes": ["pid"],
+    },
+    "reviews": {
+        "columns": {"rid": "int", "Date": "date", "Review_Text": "str", "Stars": "int"},
+        "key": ["rid"], "indexes": ["rid", "Date"],
+    },
+    "testimonials": {
+        "columns": {"tid": "int", "Testimonial_Text": "str", "Stars": "int"},
+        "key": ["tid"], "indexes": ["tid"],
+    },
+    "product_reviews": {
+        "columns": {"pid": "int", "Review_Text": "str", "rid": "nullable_int",
+                    "Match_Confidence": "float", "Match_Method": "str"},
+        "key": None, "indexes": ["pid", "rid"],
+    },
+    "review_sentiment": {
+        "columns": None,
+        "key": ["rid"], "indexes": ["rid"],
+    },
+    # One row per review-product link (unlinked reviews once, pid empty), built at ingest by review_facts.py;
+    # the per-model Sentiment_<model>/Confidence_<model> columns come on top of the typed ones
+    "review_facts": {
+        "columns": {"rid": "int", "pid": "nullable_int", "Title": "str", "Date": "date", "Stars": "int",
+                    "Text_Hash": "str", "Match_Method": "str", "Match_Confidence": "float"},
+        "key": None, "indexes": ["rid", "Date"], "dynamic": True,
+    },
+    "word_freq": {
+        "columns": {"period": "str", "word": "str", "count": "int"},
+        "key": ["period", "word"], "indexes": ["period"],
+    },
+    # Reviews that existed at the last product-page mapping; newer ones send an incremental run back to mapped products
+    "product_reviews_state": {
+        "columns": {"rid": "int", "Text_Hash": "str"},
+        "key": ["rid"], "indexes": ["rid"],
+    },
+    "word_freq_state": {
+        "columns": {"rid": "int", "Text_Hash": "str", "Period": "str"},
+        "key": ["rid"], "indexes": ["rid"],
+    },
+}
+
+SQL_TYPES = {"int": "INTEGER", "nullable_int": "INTEGER", "float": "REAL", "str": "TEXT", "date": "TEXT"}
+OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">=", "in": "IN"}
+
+
+def apply_types(df, table):
+    columns = TABLES.get(table, {}).get("columns") or {}
+    for col, kind in columns.items():
+        if col not in df:
+            continue
+        if kind == "date":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif kind == "int":
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+        elif kind == "nullable_int":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        elif kind == "float":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df
+
+
+def filter_frame(df, filters):
+    # In-memory fallback for backends that cannot push predicates down
+    for col, op, value in filters or []:
+        series = df[col]
+        if op == "in":
+            mask = series.isin(list(value))
+        else:
+            if pd.api.types.is_datetime64_any_dtype(series):
+                value = pd.Timestamp(value)
+            mask = {"==": series == value, "!=": series != value, "<": series < value,
+                    "<=": series <= value, ">": series > value, ">=": series >= value}[op]
+        df = df[mask]
+    return df
+
+
+def _date_to_text(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+# --- BACKENDS ---
+class CsvStore:
+    name = "csv"
+
+    def __init__(self, folder=DATA_FOLDER):
+        self.folder = folder
+
+    def path(self, table):
+        return os.path.join(self.folder, f"{table}.csv")
+
+    def exists(self, table):
+        return os.path.exists(self.path(table))
+
+    def read(self, table, columns=None, filters=None):
+        df = apply_types(pd.read_csv(self.path(table)), table)
+        df = filter_frame(df, filters)
+        return df[columns] if columns else df
+
+    def write(self, table, df):
+        out = df.copy()
+        if TABLES.get(table, {}).get("columns", {}) and "Date" in out:
+            out["Date"] = pd.to_datetime(out["Date"]).dt.strftime("%Y-%m-%d")
+        os.makedirs(self.folder, exist_ok=True)
+        out.to_csv(self.path(table) + ".tmp", index=False)
+        os.replace(self.path(table) + ".tmp", self.path(table))
+
+    def version(self, table):
+        return os.path.getmtime(self.path(table)) if self.exists(table) else 0
+
+
+class SqliteStore:
+    name = "sqlite"
+
+    def __init__(self, path=os.path.join(DATA_FOLDER, "store.sqlite")):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def exists(self, table):
+        if not os.path.exists(self.path):
+            return False
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+            return row is not None
+        finally:
+            conn.close()
+
+    def read(self, table, columns=None, filters=None):
+        cols = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        where, params = [], []
+        for col, op, value in filters or []:
+            if TABLES.get(table, {}).get("columns", {}) and TABLES[table]["columns"].get(col) == "date":
+                value = [_date_to_text(v) for v in value] if op == "in" else _date_to_text(value)
+            if op == "in":
+                value = list(value)
+                where.append(f'"{col}" IN ({",".join("?" * len(value))})')
+                params.extend(value)
+            else:
+                where.append(f'"{col}" {OPERATORS[op]} ?')
+                params.append(value)
+        sql = f'SELECT {cols} FROM "{table}"' + (" WHERE " + " AND ".join(where) if where else "")
+
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+        return apply_types(df, table)
+
+    @staticmethod
+    def _prepare(table, df):
+        spec = TABLES.get(table, {})
+        columns = dict(spec.get("columns") or {})
+        if not columns or spec.get("dynamic"):
+            columns.update({c: _kind_of(df[c]) for c in df.columns if c not in columns})
+        out = df.copy()
+        for col, kind in columns.items():
+            if col in out and kind == "date":
+                out[col] = pd.to_datetime(out[col]).dt.strftime("%Y-%m-%d")
+        out = out[[c for c in columns if c in out]]
+        # numpy scalars (e.g. from Int64 columns) would otherwise be bound as BLOBs
+        rows = [tuple(None if pd.isna(v) else v.item() if hasattr(v, "item") else v for v in row)
+                for row in out.itertuples(index=False)]
+        return out, columns, rows
+
+    @staticmethod
+    def _bump_version(conn, table):
+        conn.execute("CREATE TABLE IF NOT EXISTS _versions (name TEXT PRIMARY KEY, version REAL)")
+        conn.execute("INSERT OR REPLACE INTO _versions VALUES (?, ?)", (table, time.time()))
+
+    def write(self, table, df):
+        spec = TABLES.get(table, {})
+        out, columns, rows = self._prepare(table, df)
+
+        ddl = ", ".join(f'"{c}" {SQL_TYPES[columns[c]]}' for c in out.columns)
+        if spec.get("key"):
+            ddl += ", PRIMARY KEY (" + ", ".join(f'"{c}"' for c in spec["key"]) + ")"
+
+        # Whole table swapped in one transaction, so readers never see a partial write
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'CREATE TABLE "{table}" ({ddl})')
+            marks = ",".join("?" * len(out.columns))
+            conn.executemany(f'INSERT INTO "{table}" VALUES ({marks})', rows)
+            for col in spec.get("indexes", []):
+                if col in out:
+                    conn.execute(f'CREATE INDEX "idx_{table}_{col}" ON "{table}" ("{col}")')
+            self._bump_version(conn, table)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def upsert(self, table, df, key):
+        # Rows of df replace stored rows with the same key, everything else stays untouched
+        if not self.exists(table):
+            return self.write(table, df)
+        out, columns, rows = self._prepare(table, df)
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            existing = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')]
+            for col in out.columns:
+                if col not in existing:
+                    conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" {SQL_TYPES[columns[col]]}')
+            where = " AND ".join(f'"{c}" = ?' for c in key)
+            key_pos = [list(out.columns).index(c) for c in key]
+            conn.executemany(f'DELETE FROM "{table}" WHERE {where}',
+                             list({tuple(row[i] for i in key_pos) for row in rows}))
+            names = ", ".join(f'"{c}"' for c in out.columns)
+            marks = ",".join("?" * len(out.columns))
+            conn.executemany(f'INSERT INTO "{table}" ({names}) VALUES ({marks})', rows)
+            self._bump_version(conn, table)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def version(self, table):
+        # Bumped by every write of the table, so caches of other tables stay valid
+        if not os.path.exists(self.path):
+            return 0
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT version FROM _versions WHERE name = ?", (table,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        finally:
+            conn.close()
+        return row[0] if row else 0
+
+
+class ParquetStore:
+    name = "parquet"
+
+    def __init__(self, folder=os.path.join(DATA_FOLDER, "parquet")):
+        self.folder = folder
+
+    def path(self, table):
+        return os.path.join(self.folder, f"{table}.parquet")
+
+    def exists(self, table):
+        return os.path.exists(self.path(table))
+
+    def read(self, table, columns=None, filters=None):
+        pushed = []
+        for col, op, value in filters or []:
+            if TABLES.get(table, {}).get("columns", {}) and TABLES[table]["columns"].get(col) == "date":
+                value = [pd.Timestamp(v) for v in value] if op == "in" else pd.Timestamp(value)
+            pushed.append((col, op, value))
+        df = pd.read_parquet(self.path(table), columns=columns, filters=pushed or None)
+        return apply_types(df, table)
+
+    def write(self, table, df):
+        spec = TABLES.get(table, {})
+        out = apply_types(df.copy(), table)
+        # Sorting on the index columns keeps row-group min/max tight for predicate pushdown
+        sort_cols = [c for c in reversed(spec.get("indexes", [])) if c in out][:1]
+        if sort_cols:
+            out = out.sort_values(sort_cols, kind="stable")
+        os.makedirs(self.folder, exist_ok=True)
+        out.to_parquet(self.path(table) + ".tmp", index=False, row_group_size=50_000)
+        os.replace(self.path(table) + ".tmp", self.path(table))
+
+    def version(self, table):
+        return os.path.getmtime(self.path(table)) if self.exists(table) else 0
+
+
+def _kind_of(series):
+    if pd.api.types.is_integer_dtype(series):
+        return "int"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    return "str"
+
+
+# --- ENTRY POINTS ---
+def get_store(backend=DEFAULT_BACKEND):
+    if backend == "csv":
+        return CsvStore()
+    if backend == "sqlite":
+        return SqliteStore()
+    if backend == "parquet":
+        return ParquetStore()
+    raise ValueError(f"Unknown storage backend '{backend}', expected one of {BACKENDS}")
+
+
+def migrate_from_csv(store, tables=None, folder=DATA_FOLDER):
+    csv_store = CsvStore(folder)
+    migrated = []
+    for table in tables or TABLES:
+        if csv_store.exists(table):
+            store.write(table, csv_store.read(table))
+            migrated.append(table)
+    return migrated
+
+
+def read_table(table, columns=None, filters=None, store=None):
+    # First read after switching backends imports the table from the existing CSV
+    store = store or get_store()
+    if not store.exists(table):
+        if store.name == "csv" or not migrate_from_csv(store, [table]):
+            return pd.DataFrame(columns=list(TABLES.get(table, {}).get("columns") or {}))
+    return store.read(table, columns, filters)
+
+
+def load_table(table, store=None):
+    # What the dashboard shows: the stored table with dates as plain dates
+    df = read_table(table, store=store)
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date']).dt.date
+    return df
+
+
+def export_csv(table, store=None, folder=DATA_FOLDER):
+    # Copies the stored table to <folder>/<table>.csv
+    store = store or get_store()
+    if store.name != "csv" and store.exists(table):
+        CsvStore(folder).write(table, store.read(table))
+
+
+def _export_default(table):
+    # Stores passed in explicitly (benchmarks, fixtures) never touch data/
+    if CSV_EXPORT and DEFAULT_BACKEND != "csv" and table in CSV_EXPORT_TABLES:
+        export_csv(table)
+
+
+def write_table(table, df, store=None):
+    (store or get_store()).write(table, df)
+    if store is None:
+        _export_default(table)
+
+
+def upsert_table(table, df, key=None, store=None):
+    # Replaces stored rows that share a key with df and appends the new ones, instead of a full rewrite
+    key = key or TABLES[table]["key"]
+    if not key:
+        raise ValueError(f"Table '{table}' has no key, pass the columns to upsert on")
+    if df.empty:
+        return
+    default = store is None
+    store = store or get_store()
+    if hasattr(store, "upsert"):
+        store.upsert(table, df, key)
+    else:
+        existing = read_table(table, store=store)
+        if existing.empty:
+            store.write(table, df)
+        else:
+            replaced = existing.set_index(key).index.isin(df.set_index(key).index)
+            store.write(table, pd.concat([existing[~replaced], df], ignore_index=True))
+    if default:
+        _export_default(table)
+
+
+def reviews_in_month(year, month, columns=None, store=None):
+    start = pd.Timestamp(year=year, month=month, day=1)
+    end = start + pd.offsets.MonthBegin(1)
+    return read_table("reviews", columns, [("Date", ">=", start), ("Date", "<", end)], store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the scraped CSV data into the columnar/indexed store")
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "csv"], default=DEFAULT_BACKEND)
+    args = parser.parse_args()
+
+    target = get_store(args.backend)
+    done = migrate_from_csv(target)
+    print(f"SUCCESS: Migrated {', '.join(done) or 'nothing'} into the {args.backend} store")
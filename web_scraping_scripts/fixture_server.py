@@ -0,0 +1,296 @@
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import urlsplit
+import argparse
+import json
+import re
+import threading
+import time
+import os
+import sys
+
+# Local stand-in for web-scraping.dev: serves saved HTML pages so the scrapers
+# can be run and timed offline (e.g. --base-url http://127.0.0.1:8765)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(script_dir, "fixtures")
+sys.path.insert(0, os.path.join(script_dir, ".."))
+
+PRODUCTS_PER_PAGE = 5
+REVIEWS_PAGE_SIZE = 20
+TESTIMONIALS_PAGE_SIZE = 10
+GRAPHQL_FIXTURE = "api_graphql.json"
+STAR_SVG = '<svg width="16" height="16"></svg>'
+
+
+def fixture_name(url):
+    # "/products?page=2" -> "products_page_2.html", "/product/5" -> "product_5.html"
+    parts = urlsplit(url)
+    route = parts.path.strip("/") + (f"?{parts.query}" if parts.query else "")
+    return (re.sub(r"[/?=&]+", "_", route) or "index") + ".html"
+
+
+def _date_text(value):
+    return str(value)[:10]
+
+
+def _page(body):
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'></head><body>{body}</body></html>"
+
+
+# --- FIXTURES FROM THE STORED DATA ---
+def generate_fixtures(folder=FIXTURES_DIR, store=None):
+    from storage import read_table
+
+    products = read_table("products", store=store)
+    reviews = read_table("reviews", store=store)
+    testimonials = read_table("testimonials", store=store)
+    mapping = read_table("product_reviews", store=store)
+    os.makedirs(folder, exist_ok=True)
+
+    def write(url, body):
+        with open(os.path.join(folder, fixture_name(url)), "w", encoding="utf-8") as f:
+            f.write(_page(body))
+
+    # Product listing pages (one extra empty page, like the end of the real catalog)
+    n_pages = (len(products) + PRODUCTS_PER_PAGE - 1) // PRODUCTS_PER_PAGE
+    for page_num in range(1, n_pages + 2):
+        rows = products.iloc[(page_num - 1) * PRODUCTS_PER_PAGE: page_num * PRODUCTS_PER_PAGE]
+        cards = "".join(
+            f'<div class="product"><h3><a href="/product/{p.pid}">{escape(str(p.Title))}</a></h3>'
+            f'<div class="short-description">{escape(str(p.Description))}</div>'
+            f'<div class="price">{escape(str(p.Price).lstrip("$"))}</div></div>'
+            for p in rows.itertuples()
+        )
+        write(f"/products?page={page_num}", cards)
+
+    # Product detail pages with their reviews
+    for p in products.itertuples():
+        texts = mapping.loc[mapping['pid'] == p.pid, 'Review_Text'].astype(str)
+        texts = [t for t in texts if not t.startswith(("No reviews found", "Error extracting"))]
+        body = f"<h3>{escape(str(p.Title))}</h3>" + "".join(
+            f'<div class="review"><p>{escape(t)}</p></div>' for t in texts
+        )
+        write(f"/product/{p.pid}", body)
+
+    # Reviews: first page in the HTML, the rest behind the load-more button (GraphQL endpoint)
+    nodes = [{"rid": int(r.rid), "text": str(r.Review_Text), "rating": int(r.Stars), "date": _date_text(r.Date)}
+             for r in reviews.itertuples()]
+    with open(os.path.join(folder, GRAPHQL_FIXTURE), "w", encoding="utf-8") as f:
+        json.dump(nodes, f)
+    first = "".join(_review_html(n) for n in nodes[:REVIEWS_PAGE_SIZE])
+    button = (f'<button id="page-load-more" data-after="{REVIEWS_PAGE_SIZE}">Load More</button>'
+              if len(nodes) > REVIEWS_PAGE_SIZE else "")
+    write("/reviews", f'<div id="reviews">{first}</div>{button}{LOAD_MORE_JS}')
+
+    # Testimonials: infinite scroll, each batch names the next one in hx-get
+    batches = [testimonials.iloc[i:i + TESTIMONIALS_PAGE_SIZE] for i in range(0, len(testimonials), TESTIMONIALS_PAGE_SIZE)]
+    for page_num, batch in enumerate(batches, start=1):
+        items = [
+            f'<div class="testimonial"><span class="rating">{STAR_SVG * int(t.Stars)}</span>'
+            f'<p class="text">{escape(str(t.Testimonial_Text))}</p></div>'
+            for t in batch.itertuples()
+        ]
+        if page_num < len(batches) and items:
+            items[-1] = items[-1].replace('<div class="testimonial">',
+                                          f'<div class="testimonial" hx-get="/api/testimonials?page={page_num + 1}">', 1)
+        if page_num == 1:
+            write("/testimonials", f'<div id="testimonials">{"".join(items)}</div>{SCROLL_JS}')
+        else:
+            with open(os.path.join(folder, fixture_name(f"/api/testimonials?page={page_num}")), "w", encoding="utf-8") as f:
+                f.write("".join(items))
+    print(f"SUCCESS: Generated fixtures in {folder}")
+
+
+def _review_html(node):
+    return (f'<div data-testid="review"><span data-testid="review-date">{node["date"]}</span>'
+            f'<div data-testid="review-stars">{STAR_SVG * node["rating"]}</div>'
+            f'<p data-testid="review-text">{escape(node["text"])}</p></div>')
+
+
+# Minimal stand-ins for the site's scripts, so the Selenium scrapers work against the fixtures too
+LOAD_MORE_JS = """<script>
+document.getElementById('page-load-more')?.addEventListener('click', async function () {
+  const btn = this;
+  const res = await fetch('/api/graphql', {method: 'POST', headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({variables: {first: %d, after: btn.dataset.after}})});
+  const page = (await res.json()).data.reviews;
+  const box = document.getElementById('reviews');
+  for (const edge of page.edges) {
+    const n = edge.node, div = document.createElement('div');
+    div.setAttribute('data-testid', 'review');
+    div.innerHTML = '<span data-testid="review-date"></span><div data-testid="review-stars">' +
+      '%s'.repeat(n.rating) + '</div><p data-testid="review-text"></p>';
+    div.querySelector('[data-testid="review-date"]').textContent = n.date;
+    div.querySelector('[data-testid="review-text"]').textContent = n.text;
+    box.appendChild(div);
+  }
+  if (page.pageInfo.hasNextPage) { btn.dataset.after = page.pageInfo.endCursor; } else { btn.remove(); }
+});
+</script>""" % (REVIEWS_PAGE_SIZE, STAR_SVG)
+
+SCROLL_JS = """<script>
+let loading = false;
+window.addEventListener('scroll', async function () {
+  const trigger = document.querySelector('[hx-get]');
+  if (loading || !trigger || window.innerHeight + window.scrollY < document.body.scrollHeight - 50) return;
+  loading = true;
+  const res = await fetch(trigger.getAttribute('hx-get'), {headers: {'X-Secret-Token': 'secret123'}});
+  trigger.removeAttribute('hx-get');
+  document.getElementById('testimonials').insertAdjacentHTML('beforeend', await res.text());
+  loading = false;
+});
+</script>"""
+
+
+# --- FIXTURES FROM THE LIVE SITE ---
+def save_fixtures(base_url="https://web-scraping.dev", folder=FIXTURES_DIR, headless=True):
+    from selenium.webdriver.common.by import By
+    from scraper_all import get_driver
+    from scraper_product_reviews import DETAIL_GRACE
+    from waits import WaitLog, load_page, paginate
+
+    driver = get_driver(headless=headless)
+    log = WaitLog()
+    os.makedirs(folder, exist_ok=True)
+
+    def save(url):
+        # The page as loaded right now; links point back at the fixture server instead of the live site
+        html = driver.page_source.replace(base_url, "")
+        with open(os.path.join(folder, fixture_name(url[len(base_url):])), "w", encoding="utf-8") as f:
+            f.write(html)
+
+    try:
+        # Listing pages until one comes back empty (saved too, it is where the scrapers stop)
+        links, last_page = [], 0
+        listing_url = lambda n: f"{base_url}/products?page={n}"
+
+        def parse_page(page_num):
+            nonlocal last_page
+            last_page = page_num
+            save(listing_url(page_num))
+            links.extend(a.get_attribute('href') for a in driver.find_elements(By.CSS_SELECTOR, "h3 a"))
+
+        paginate(driver, listing_url, By.CLASS_NAME, "product", log, "products", parse_page)
+        save(listing_url(last_page + 1))
+
+        # Each page is saved once its items are there, not after a fixed sleep
+        for link in links:
+            load_page(driver, link, By.CSS_SELECTOR, "div.review", grace=DETAIL_GRACE)
+            save(link)
+        load_page(driver, f"{base_url}/reviews", By.CSS_SELECTOR, '[data-testid="review"]')
+        save(f"{base_url}/reviews")
+        load_page(driver, f"{base_url}/testimonials", By.CLASS_NAME, "testimonial")
+        save(f"{base_url}/testimonials")
+        print(f"SUCCESS: Saved {last_page + 1 + len(links) + 2} pages to {folder}")
+    finally:
+        driver.quit()
+
+
+# --- SERVER ---
+def make_handler(folder, latency):
+    class FixtureHandler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            # Simulated network/render time, so parallel speedups show up locally
+            if latency:
+                time.sleep(latency)
+            # Like the real site, the testimonials API rejects requests without the page's token
+            if self.path.startswith("/api/testimonials") and self.headers.get("X-Secret-Token") != "secret123":
+                self.send_error(403)
+                return
+            path = os.path.join(folder, fixture_name(self.path))
+            if not os.path.exists(path):
+                self.send_error(404)
+                return
+            with open(path, "rb") as f:
+                self._send(f.read(), "text/html; charset=utf-8")
+
+        def do_POST(self):
+            # GraphQL reviews paging: {"variables": {"first": 20, "after": "<cursor>"}}
+            if latency:
+                time.sleep(latency)
+            path = os.path.join(folder, GRAPHQL_FIXTURE)
+            if urlsplit(self.path).path != "/api/graphql" or not os.path.exists(path):
+                self.send_error(404)
+                return
+            variables = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}").get("variables", {})
+            first, start = int(variables.get("first") or REVIEWS_PAGE_SIZE), int(variables.get("after") or 0)
+            with open(path, encoding="utf-8") as f:
+                nodes = json.load(f)
+            page = nodes[start:start + first]
+            end = start + len(page)
+            payload = {"data": {"reviews": {
+                "edges": [{"node": n, "cursor": str(start + i + 1)} for i, n in enumerate(page)],
+                "pageInfo": {"endCursor": str(end), "hasNextPage": end < len(nodes)},
+            }}}
+            self._send(json.dumps(payload).encode("utf-8"), "application/json")
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_server(folder=FIXTURES_DIR, port=0, latency=0.0):
+    # Runs in a background thread; returns the server and its base URL
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(folder, latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench_mapping(worker_counts, latency, headless=True, folder=FIXTURES_DIR):
+    from scraper_product_reviews import scrape_mapping
+
+    server, base_url = start_server(folder, latency=latency)
+    try:
+        timings, reference = [], None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            df = scrape_mapping(headless_mode=headless, workers=workers, base_url=base_url, delay=0, save=False)
+            elapsed = time.perf_counter() - start
+            # Every worker count must produce exactly the same mapping
+            same = reference is None or df.equals(reference)
+            reference = df if reference is None else reference
+            timings.append((workers, elapsed, same))
+        for workers, elapsed, same in timings:
+            print(f"workers={workers:>2}  {elapsed:6.1f}s  {'identical output' if same else 'OUTPUT DIFFERS'}")
+        return timings
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline fixtures for the scrapers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("generate", help="Build fixture pages from the stored data")
+    save_cmd = sub.add_parser("save", help="Snapshot the live site into fixture pages")
+    save_cmd.add_argument("--base-url", default="https://web-scraping.dev")
+    serve_cmd = sub.add_parser("serve", help="Serve the fixture pages")
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    serve_cmd.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    bench_cmd = sub.add_parser("bench", help="Time scrape_mapping against the fixtures")
+    bench_cmd.add_argument("--workers", default="1,2,4", help="Comma separated worker counts")
+    bench_cmd.add_argument("--latency", type=float, default=0.5)
+    bench_cmd.add_argument("--visible", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_fixtures()
+    elif args.command == "save":
+        save_fixtures(args.base_url)
+    elif args.command == "serve":
+        server, url = start_server(port=args.port, latency=args.latency)
+        print(f"Serving {FIXTURES_DIR} at {url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        bench_mapping([int(w) for w in args.workers.split(",")], args.latency, headless=not args.visible)
@@ -0,0 +1,261 @@
+from urllib.parse import urljoin, urlsplit
+import pandas as pd
+import argparse
+import asyncio
+import json
+import time
+import os
+import sys
+
+# Browserless scraping: server-rendered pages are fetched with a pooled HTTP client and parsed
+# directly; the JS-only parts (load-more reviews, infinite-scroll testimonials) go through the
+# site's own paging endpoints, and Selenium is only started if the listing or one of those endpoints fails.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, ".."))
+
+BASE_URL = "https://web-scraping.dev"
+DEFAULT_CONCURRENCY = 4 # open requests per host
+REVIEWS_PAGE_SIZE = 20
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Endpoint behind the "page-load-more" button on /reviews
+REVIEWS_GRAPHQL = "/api/graphql"
+REVIEWS_QUERY = """
+query GetReviews($first: Int, $after: String) {
+  reviews(first: $first, after: $after) {
+    edges { node { rid text rating date } cursor }
+    pageInfo { endCursor hasNextPage }
+  }
+}
+"""
+# The infinite-scroll testimonials API only answers requests that look like they come from the page
+TESTIMONIALS_HEADERS = {"X-Secret-Token": "secret123"}
+
+
+class HostLimiter:
+    # One semaphore per host, so a slow host cannot take every connection
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._semaphores[host]
+
+
+async def fetch(session, limiter, url, method="GET", retries=2, **kwargs):
+    # (status, body); status None when the request never got an answer
+    import aiohttp
+
+    for attempt in range(retries + 1):
+        status, text = None, ""
+        try:
+            async with limiter(url):
+                async with session.request(method, url, **kwargs) as resp:
+                    status, text = resp.status, await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = e
+        else:
+            # Overload and gateway errors are retried like connection errors; any other status is the answer
+            if status not in RETRY_STATUSES:
+                return status, text
+            error = f"HTTP {status}"
+        if attempt == retries:
+            print(f"    Giving up on {url}: {error}")
+            return status, text
+        await asyncio.sleep(0.5 * (attempt + 1))
+
+
+# --- PARSERS (same fields as the Selenium scrapers) ---
+def _soup(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser")
+
+
+def _text(el):
+    return el.get_text(" ", strip=True) if el is not None else ""
+
+
+def parse_products(html, base_url):
+    products, links = [], []
+    for card in _soup(html).select(".product"):
+        title, desc, price = card.find("h3"), card.select_one(".short-description"), card.select_one(".price")
+        if title is None or desc is None or price is None:
+            continue
+        link = card.select_one("h3 a")
+        link = urljoin(base_url + "/", link["href"]) if link is not None and link.get("href") else None
+        products.append({"Title": _text(title), "Description": _text(desc), "Price": f"${_text(price)}", "Link": link})
+        links.append(link)
+    return products, links
+
+
+def parse_product_reviews(html):
+    return [_text(rev.find("p")) for rev in _soup(html).select("div.review") if rev.find("p") is not None]
+
+
+def parse_testimonials(html, page_url):
+    soup = _soup(html)
+    rows = []
+    for test in soup.select(".testimonial"):
+        rating, text = test.select_one(".rating"), test.select_one(".text")
+        if rating is None or text is None:
+            continue
+        rows.append({"Testimonial_Text": _text(text), "Stars": len(rating.find_all("svg"))})
+    # htmx loads the next batch from the hx-get of the last element
+    trigger = soup.select("[hx-get]")
+    next_url = urljoin(page_url, trigger[-1]["hx-get"]) if trigger else None
+    return rows, next_url
+
+
+# --- CRAWLERS ---
+async def crawl_products(session, limiter, base_url, concurrency):
+    # Listing pages are fetched a wave at a time until one comes back empty (or 404).
+    # Returns (None, None) when a page failed to load: the saved catalog is replaced by
+    # this list, so a failed page must not pass for the end of it
+    products, links, page_num = [], [], 1
+    while True:
+        wave = list(range(page_num, page_num + concurrency))
+        pages = await asyncio.gather(*[fetch(session, limiter, f"{base_url}/products?page={n}") for n in wave])
+        done = False
+        for n, (status, html) in zip(wave, pages):
+            if status not in (200, 404):
+                print(f"   products page {n}: failed ({status or 'no response'})")
+                return None, None
+            rows, page_links = parse_products(html, base_url) if status == 200 else ([], [])
+            print(f"   products page {n}: {len(rows)} products")
+            if not rows:
+                done = True
+                break
+            products += rows
+            links += page_links
+        if done:
+            break
+        page_num += concurrency
+    for pid, row in enumerate(products, start=1):
+        row["pid"] = pid
+    return products, links
+
+
+async def crawl_mapping(session, limiter, links):
+    async def one(pid, link):
+        status, html = await fetch(session, limiter, link) if link else (None, "")
+        if status != 200:
+            return [{"pid": pid, "Review_Text": "Error extracting reviews."}]
+        texts = parse_product_reviews(html)
+        if not texts:
+            return [{"pid": pid, "Review_Text": "No reviews found for this product."}]
+        return [{"pid": pid, "Review_Text": t} for t in texts]
+
+    results = await asyncio.gather(*[one(pid, link) for pid, link in enumerate(links, start=1)])
+    return [row for rows in results for row in rows]
+
+
+async def crawl_reviews(session, limiter, base_url):
+    # Returns None when the paging endpoint is not usable, so the caller can fall back to Selenium
+    reviews, after = [], None
+    while True:
+        body = {"query": REVIEWS_QUERY, "variables": {"first": REVIEWS_PAGE_SIZE, "after": after}}
+        status, text = await fetch(session, limiter, base_url + REVIEWS_GRAPHQL, method="POST", json=body,
+                                   headers={"Referer": f"{base_url}/reviews"})
+        try:
+            page = json.loads(text)["data"]["reviews"] if status == 200 else None
+        except (ValueError, KeyError, TypeError):
+            page = None
+        if page is None:
+            return None
+        for edge in page["edges"]:
+            node = edge["node"]
+            reviews.append({"Date": node["date"], "Review_Text": node["text"], "Stars": int(node["rating"])})
+        print(f"   reviews: {len(reviews)} so far")
+        if not page["pageInfo"]["hasNextPage"] or not page["edges"]:
+            break
+        after = page["pageInfo"]["endCursor"]
+    for rid, row in enumerate(reviews, start=1):
+        row["rid"] = rid
+    return reviews
+
+
+async def crawl_testimonials(session, limiter, base_url):
+    url = f"{base_url}/testimonials"
+    headers = {"Referer": url, **TESTIMONIALS_HEADERS}
+    testimonials, seen = [], set()
+    while url and url not in seen:
+        seen.add(url)
+        status, html = await fetch(session, limiter, url, headers=headers)
+        if status != 200:
+            return None
+        rows, url = parse_testimonials(html, url)
+        testimonials += rows
+        print(f"   testimonials: {len(testimonials)} so far")
+    for tid, row in enumerate(testimonials, start=1):
+        row["tid"] = tid
+    return testimonials
+
+
+async def crawl(base_url=BASE_URL, concurrency=DEFAULT_CONCURRENCY, mapping=True):
+    import aiohttp
+
+    limiter = HostLimiter(concurrency)
+    connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        products, links = await crawl_products(session, limiter, base_url, concurrency)
+        # Detail pages, reviews and testimonials all share the same pool
+        mapping_rows, reviews, testimonials = await asyncio.gather(
+            crawl_mapping(session, limiter, links) if mapping and products is not None else asyncio.sleep(0, result=None),
+            crawl_reviews(session, limiter, base_url),
+            crawl_testimonials(session, limiter, base_url),
+        )
+    return {"products": products, "mapping": mapping_rows, "reviews": reviews, "testimonials": testimonials}
+
+
+def scrape_http(base_url=BASE_URL, concurrency=DEFAULT_CONCURRENCY, headless_mode=True, save=True):
+    print(f"--- HTTP Scrape of {base_url} (Concurrency={concurrency}/host) ---")
+    start = time.perf_counter()
+    result = asyncio.run(crawl(base_url, concurrency))
+
+    # Selenium only for sections whose endpoint did not work
+    if result["products"] is None or result["reviews"] is None or result["testimonials"] is None:
+        from scraper_all import get_driver, scrape_products, scrape_reviews, scrape_testimonials
+        driver = get_driver(headless=headless_mode)
+        try:
+            if result["products"] is None:
+                print("--- Product listing failed, falling back to Selenium (listing + product pages) ---")
+                from scraper_product_reviews import map_products
+                result["products"] = scrape_products(driver, base_url)
+                result["mapping"] = map_products(driver, [(row["pid"], row["Link"]) for row in result["products"]],
+                                                 headless_mode).to_dict("records")
+            if result["reviews"] is None:
+                print("--- Reviews endpoint unavailable, falling back to Selenium ---")
+                result["reviews"] = scrape_reviews(driver, base_url)
+            if result["testimonials"] is None:
+                print("--- Testimonials endpoint unavailable, falling back to Selenium ---")
+                result["testimonials"] = scrape_testimonials(driver, base_url)
+        finally:
+            driver.quit()
+
+    print(f"Fetched {len(result['products'])} products, {len(result['reviews'])} reviews, "
+          f"{len(result['testimonials'])} testimonials in {time.perf_counter() - start:.1f}s")
+
+    if save:
+        from ingest import save_mapping, save_results
+        save_results(result["products"], result["reviews"], result["testimonials"])
+        save_mapping(pd.DataFrame(result["mapping"]))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape everything over plain HTTP (Selenium only as fallback)")
+    parser.add_argument("--headless", action="store_true", help="Headless Chrome if a fallback is needed")
+    parser.add_argument("--base-url", default=BASE_URL, help="Site to scrape (e.g. a local fixture server)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Open requests per host")
+    args = parser.parse_args()
+
+    scrape_http(args.base_url, args.concurrency, headless_mode=args.headless)
+
+    from ingest import link_reviews_to_ids, score_new_reviews
+    link_reviews_to_ids()
+    score_new_reviews()
@@ -0,0 +1,158 @@
+from urllib.parse import urlsplit
+import pandas as pd
+import json
+import threading
+import os
+import sys
+
+# Incremental scraping: checkpoints so an interrupted run can resume, and stable ids so a refresh
+# only upserts new/changed rows instead of renumbering everything.
+# Resume granularity: product listing pages and product detail pages are saved one by one;
+# reviews and testimonials are saved once their stage finishes, so an interrupted stage starts over.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, ".."))
+from sentiment_cache import text_hash
+from storage import read_table, upsert_table, write_table
+
+CHECKPOINT_DIR = os.path.join(script_dir, "..", "data", ".checkpoints")
+
+
+class Checkpoint:
+    def __init__(self, name, folder=CHECKPOINT_DIR):
+        self.path = os.path.join(folder, f"{name}.json")
+        # Items from record(), one JSON line each, so saving a page costs the page and not the whole state
+        self.log_path = os.path.join(folder, f"{name}.jsonl")
+        self.state = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.state = json.load(f)
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut off by the interruption; that page is simply fetched again
+                        continue
+                    self.state.setdefault(item["section"], {})[str(item["key"])] = item["value"]
+        if os.path.exists(self.path) or os.path.exists(self.log_path):
+            print(f"Resuming from checkpoint {self.path}")
+        return self.state
+
+    def _save(self):
+        # Written to a temp file and swapped in, so a crash mid-save keeps the previous checkpoint
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.state, f, default=str)
+        os.replace(self.path + ".tmp", self.path)
+
+    def update(self, **values):
+        with self._lock:
+            self.state.update(values)
+            self._save()
+
+    def record(self, section, key, value):
+        # One finished item (e.g. a product page) from any worker thread, appended to the log
+        line = json.dumps({"section": section, "key": key, "value": value}, default=str) + "\n"
+        with self._lock:
+            self.state.setdefault(section, {})[str(key)] = value
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write(line)
+
+    def clear(self):
+        for path in (self.path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.state = {}
+
+
+# --- STABLE IDS ---
+def _date_text(dates):
+    return pd.to_datetime(dates, errors="coerce").fillna(pd.Timestamp("2023-01-01")).dt.strftime("%Y-%m-%d")
+
+
+def product_paths(df):
+    # Detail-page path ("/product/13") of every product row, whatever site it was scraped from.
+    # Titles repeat in the catalog, so this is what tells products apart; rows stored before
+    # links were kept fall back to the site's own numbering, which the scraped pids follow
+    links = df["Link"] if "Link" in df else pd.Series(None, index=df.index, dtype=object)
+    paths = links.map(lambda link: urlsplit(link).path if isinstance(link, str) and link else None)
+    return paths.fillna("/product/" + df["pid"].astype(str)) if "pid" in df else paths
+
+
+# Which column holds the id, and what identifies the same row across runs
+ID_COLUMNS = {"products": "pid", "reviews": "rid", "testimonials": "tid"}
+
+
+def natural_keys(table, df):
+    if table == "products":
+        return product_paths(df).astype(str).map(text_hash)
+    if table == "reviews":
+        return (_date_text(df["Date"]) + "|" + df["Review_Text"].astype(str)).map(text_hash)
+    if table == "testimonials":
+        return df["Testimonial_Text"].astype(str).map(text_hash)
+    raise ValueError(f"No natural key for table '{table}'")
+
+
+def stored_keys(table):
+    stored = read_table(table)
+    return set(natural_keys(table, stored)) if not stored.empty else set()
+
+
+# --- PRODUCT PAGES TO REVISIT ---
+MAPPING_STATE_TABLE = "product_reviews_state"
+
+
+def unmapped_reviews():
+    # Stored reviews that were not there yet when the product pages were last mapped
+    reviews = read_table("reviews", columns=["rid", "Review_Text"])
+    seen = set(read_table(MAPPING_STATE_TABLE, columns=["Text_Hash"])["Text_Hash"])
+    return int((~reviews["Review_Text"].astype(str).map(text_hash).isin(seen)).sum())
+
+
+def mark_reviews_mapped():
+    reviews = read_table("reviews", columns=["rid", "Review_Text"])
+    write_table(MAPPING_STATE_TABLE, reviews.assign(Text_Hash=reviews["Review_Text"].astype(str).map(text_hash))[["rid", "Text_Hash"]])
+
+
+def upsert_scraped(table, rows):
+    # Known rows keep their id, new rows get ids after the current maximum; only new or changed rows are written
+    id_col = ID_COLUMNS[table]
+    scraped = pd.DataFrame(rows)
+    if scraped.empty:
+        return 0, 0
+    if table == "reviews":
+        scraped["Date"] = _date_text(scraped["Date"])
+    scraped = scraped.assign(_key=natural_keys(table, scraped)).drop_duplicates("_key")
+
+    stored = read_table(table)
+    if stored.empty:
+        stored = pd.DataFrame(columns=list(scraped.columns.drop("_key")))
+    if table == "reviews" and not stored.empty:
+        stored["Date"] = _date_text(stored["Date"])
+    stored = stored.assign(_key=natural_keys(table, stored) if not stored.empty else [])
+    id_by_key = dict(zip(stored["_key"], stored[id_col]))
+
+    known = scraped["_key"].isin(id_by_key)
+    next_id = int(pd.to_numeric(stored[id_col]).max()) + 1 if not stored.empty else 1
+    scraped[id_col] = [id_by_key[k] if k in id_by_key else None for k in scraped["_key"]]
+    scraped.loc[~known, id_col] = range(next_id, next_id + int((~known).sum()))
+
+    # Unchanged rows are skipped entirely
+    value_cols = [c for c in scraped.columns if c not in (id_col, "_key")]
+    after = scraped.set_index("_key")[value_cols].astype(str)
+    if stored.empty:
+        same = pd.Series(False, index=after.index)
+    else:
+        before = stored.drop_duplicates("_key").set_index("_key").reindex(columns=value_cols).astype(str)
+        same = (after == before.reindex(after.index)).all(axis=1)
+    changed = scraped[~same.to_numpy()].drop(columns="_key")
+
+    upsert_table(table, changed)
+    n_new = int((~known).sum())
+    print(f"   {table}: {n_new} new, {len(changed) - n_new} changed, {len(scraped) - len(changed)} unchanged")
+    return n_new, len(changed) - n_new
@@ -0,0 +1,80 @@
+import pandas as pd
+import os
+import sys
+
+# Post-scrape stages shared by every scraper: saving the scraped rows, linking product-page
+# reviews to rids and precomputing sentiment. No browser imports here, so the HTTP engine
+# saves through the same code without Selenium installed.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, ".."))
+from storage import get_store, read_table, upsert_table, write_table
+from word_freq import update_word_freqs
+from incremental import mark_reviews_mapped, upsert_scraped
+
+# --- SAVE SEPARATE TABLES ---
+def save_results(products_data, reviews_data, testimonials_data):
+    write_table("products", pd.DataFrame(products_data))
+    write_table("testimonials", pd.DataFrame(testimonials_data))
+
+    df_rev = pd.DataFrame(reviews_data)
+    df_rev['Date'] = pd.to_datetime(df_rev['Date'], errors='coerce').fillna(pd.Timestamp('2023-01-01'))
+    write_table("reviews", df_rev)
+
+    # Word-cloud counts for the new reviews only
+    update_word_freqs()
+
+    print(f"Success! Saved to the {get_store().name} store")
+
+def save_incremental(products_data, reviews_data, testimonials_data):
+    # Stored rows keep their ids; only new or changed rows are written
+    upsert_scraped("products", products_data)
+    upsert_scraped("reviews", reviews_data)
+    upsert_scraped("testimonials", testimonials_data)
+    update_word_freqs()
+    print(f"Success! Upserted into the {get_store().name} store")
+
+def _review_lists(df):
+    return df.groupby("pid")["Review_Text"].agg(lambda texts: tuple(sorted(texts.astype(str))))
+
+def save_mapping(df, incremental=False):
+    if incremental:
+        # Only products whose page shows other reviews than stored are replaced; everything else stays as stored
+        after = _review_lists(df)
+        before = _review_lists(read_table("product_reviews", columns=["pid", "Review_Text"]))
+        changed = after.index[after != before.reindex(after.index)]
+        upsert_table("product_reviews", df[df["pid"].isin(changed)], key=["pid"])
+        print(f"SUCCESS: Upserted mapping for {len(changed)} of {len(after)} fetched products into the {get_store().name} store")
+    else:
+        # Save mapping (linked to rids below)
+        write_table("product_reviews", df)
+        print(f"SUCCESS: Saved mapping to the {get_store().name} store")
+    # The reviews stored now are covered; later ones make the next incremental run revisit mapped products
+    mark_reviews_mapped()
+
+# --- AFTER THE SCRAPE ---
+def link_reviews_to_ids(store=None):
+    print("--- Linking Product Reviews to Global Review IDs (rid) ---")
+    from review_linker import link_stored, link_summary
+
+    # Normalized exact match first, then near-duplicates (MinHash/LSH) with their confidence
+    linked = link_stored(store)
+    if linked is None:
+        print("Error: Make sure products reviews and global reviews were scraped first.")
+        return
+    print(f"SUCCESS: Linked {link_summary(linked)}. Saved to the {(store or get_store()).name} store")
+
+    from review_facts import build_facts
+    build_facts(store)
+
+def score_new_reviews():
+    # Post-scrape stage: sentiment for every model, so the dashboard does not run it per viewer
+    print("--- Precomputing Sentiment for New Reviews ---")
+    try:
+        from precompute_sentiment import precompute_sentiment
+        precompute_sentiment()
+    except Exception as e:
+        # Missing ML packages, a failed model download, ...: the scrape itself must still land
+        print(f"Skipped sentiment precompute ({type(e).__name__}: {e}). Run 'python precompute_sentiment.py' later.")
+        # Titles and stars still reach the fact table, only without scores
+        from review_facts import build_facts
+        build_facts()
@@ -1,13 +1,18 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import pandas as pd
-import time
+import argparse
 import os
 import sys
 
+# Project root, for the shared modules next to app.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import perf
+from waits import WaitLog, click_load_more, paginate, scroll_until_stable
+from incremental import Checkpoint, natural_keys, stored_keys
+from ingest import save_incremental, save_results
+
 def get_driver(headless=False): # ADD PARAMETER
     options = Options()
     if headless:
@@ -17,46 +22,66 @@ def get_driver(headless=False): # ADD PARAMETER
         options.add_argument("--window-size=1920,1080")
     return webdriver.Chrome(options=options)
 
-def scrape_all(headless_mode=False): # ADD PARAMETER
-    driver = get_driver(headless=headless_mode)
-    base_url = "https://web-scraping.dev"
-    
-    products_data = []
-    reviews_data = []
-    testimonials_data = []
+BASE_URL = "https://web-scraping.dev"
+WAITS_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "scrape_waits.json")
 
-    try:
-        # --- 1. PRODUCTS (pid) ---
-        print(f"--- Scraping Products (Headless={headless_mode}) ---")
-        p_id_counter = 1
-        for page_num in range(1, 7):
-            driver.get(f"{base_url}/products?page={page_num}")
-            time.sleep(2)
-            cards = driver.find_elements(By.CLASS_NAME, "product")
-            for card in cards:
-                try:
-                    products_data.append({
-                        "pid": p_id_counter,
-                        "Title": card.find_element(By.TAG_NAME, "h3").text,
-                        "Description": card.find_element(By.CLASS_NAME, "short-description").text,
-                        "Price": f"${card.find_element(By.CLASS_NAME, 'price').text}"
-                    })
-                    p_id_counter += 1
-                except: continue
-
-        # --- 2. REVIEWS (rid) ---
-        print("--- Scraping Reviews ---")
-        r_id_counter = 1
-        driver.get(f"{base_url}/reviews")
-        for i in range(5):
+# --- 1. PRODUCTS (pid) ---
+def scrape_products(driver, base_url=BASE_URL, log=None, checkpoint=None):
+    # Each card's detail-page "Link" is kept: it tells products with the same title apart, and the
+    # mapping needs no second listing pass
+    log = log or WaitLog()
+    # An interrupted incremental run picks up after the last saved page
+    state = checkpoint.state if checkpoint else {}
+    products_data = list(state.get("products", []))
+    p_id_counter = len(products_data) + 1
+
+    def parse_page(page_num):
+        nonlocal p_id_counter
+        cards = driver.find_elements(By.CLASS_NAME, "product")
+        for card in cards:
             try:
-                load_more = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.ID, "page-load-more")))
-                driver.execute_script("arguments[0].scrollIntoView();", load_more)
-                time.sleep(1)
-                driver.execute_script("arguments[0].click();", load_more)
-                time.sleep(2)
-            except: break
+                row = {
+                    "pid": p_id_counter,
+                    "Title": card.find_element(By.TAG_NAME, "h3").text,
+                    "Description": card.find_element(By.CLASS_NAME, "short-description").text,
+                    "Price": f"${card.find_element(By.CLASS_NAME, 'price').text}",
+                    "Link": card.find_element(By.CSS_SELECTOR, "h3 a").get_attribute("href"),
+                }
+                products_data.append(row)
+                p_id_counter += 1
+            except: continue
+        if checkpoint:
+            checkpoint.update(products=products_data, products_page=page_num)
+
+    # Pages are followed until one comes back empty, however many the catalog has
+    paginate(driver, lambda n: f"{base_url}/products?page={n}", By.CLASS_NAME, "product", log, "products", parse_page,
+             first_page=state.get("products_page", 0) + 1)
+    return products_data
+
+# --- 2. REVIEWS (rid) ---
+REVIEW_PAIRS_JS = """
+return Array.from(document.querySelectorAll('[data-testid="review"]')).map(r => [
+    (r.querySelector('[data-testid="review-date"]') || {}).textContent || '',
+    (r.querySelector('[data-testid="review-text"]') || {}).textContent || '']);
+"""
+
+def scrape_reviews(driver, base_url=BASE_URL, log=None, known_keys=None):
+    log = log or WaitLog()
+    reviews_data = []
+    r_id_counter = 1
+    with perf.span("page.fetch", url=f"{base_url}/reviews"):
+        driver.get(f"{base_url}/reviews")
 
+    # Newest reviews come first, so once a loaded review is already stored the older ones are too
+    def reached_stored(d):
+        pairs = pd.DataFrame(d.execute_script(REVIEW_PAIRS_JS), columns=["Date", "Review_Text"])
+        return natural_keys("reviews", pairs).isin(known_keys).any()
+
+    # Each click waits for new reviews (or the button going away), not a fixed sleep
+    click_load_more(driver, "page-load-more", By.CSS_SELECTOR, '[data-testid="review"]', log,
+                    stop_when=reached_stored if known_keys else None)
+
+    with perf.span("reviews.parse") as s:
         review_elements = driver.find_elements(By.CSS_SELECTOR, '[data-testid="review"]')
         for rev in review_elements:
             try:
@@ -69,15 +94,20 @@ def scrape_all(headless_mode=False): # ADD PARAMETER
                 })
                 r_id_counter += 1
             except: continue
+        s.rows = len(reviews_data)
+    return reviews_data
 
-        # --- 3. TESTIMONIALS (tid) ---
-        print("--- Scraping Testimonials ---")
-        t_id_counter = 1
+# --- 3. TESTIMONIALS (tid) ---
+def scrape_testimonials(driver, base_url=BASE_URL, log=None):
+    log = log or WaitLog()
+    testimonials_data = []
+    t_id_counter = 1
+    with perf.span("page.fetch", url=f"{base_url}/testimonials"):
         driver.get(f"{base_url}/testimonials")
-        for _ in range(5):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
+    # Scroll until a scroll stops loading more testimonials
+    scroll_until_stable(driver, By.CLASS_NAME, "testimonial", log)
+        
+    with perf.span("testimonials.parse") as s:
         testimonial_elements = driver.find_elements(By.CLASS_NAME, "testimonial")
         for test in testimonial_elements:
             try:
@@ -89,31 +119,56 @@ def scrape_all(headless_mode=False): # ADD PARAMETER
                 })
                 t_id_counter += 1
             except: continue
+        s.rows = len(testimonials_data)
+    return testimonials_data
 
-        # --- SAVE SEPARATE FILES ---
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        data_folder = os.path.join(script_dir, "..", "data")
+def run_stage(name, scrape, checkpoint=None):
+    # A stage finished before an interruption is taken from the checkpoint instead of scraped again
+    state = checkpoint.state if checkpoint else {}
+    if state.get(f"{name}_done"):
+        return state[name]
+    with perf.span(f"stage.{name}") as s:
+        rows = scrape()
+        s.rows = len(rows)
+    if checkpoint:
+        checkpoint.update(**{name: rows, f"{name}_done": True})
+    return rows
 
-        if not os.path.exists(data_folder):
-            os.makedirs(data_folder)
+def scrape_all(headless_mode=False, base_url=BASE_URL, incremental=False): # ADD PARAMETER
+    driver = get_driver(headless=headless_mode)
+    log = WaitLog()
+    checkpoint = Checkpoint("scraper_all") if incremental else None
+    if checkpoint: checkpoint.load()
 
-        products_path = os.path.join(data_folder, "products.csv")
-        testimonials_path = os.path.join(data_folder, "testimonials.csv")
-        reviews_path = os.path.join(data_folder, "reviews.csv")
-        
-        pd.DataFrame(products_data).to_csv(products_path, index=False)
-        pd.DataFrame(testimonials_data).to_csv(testimonials_path, index=False)
-        
-        df_rev = pd.DataFrame(reviews_data)
-        df_rev['Date'] = pd.to_datetime(df_rev['Date'], errors='coerce').fillna(pd.Timestamp('2023-01-01'))
-        df_rev.to_csv(reviews_path, index=False)
+    try:
+        print(f"--- Scraping Products (Headless={headless_mode}, Incremental={incremental}) ---")
+        products_data = run_stage("products", lambda: scrape_products(driver, base_url, log, checkpoint), checkpoint)
+
+        print("--- Scraping Reviews ---")
+        known = stored_keys("reviews") if incremental else None
+        reviews_data = run_stage("reviews", lambda: scrape_reviews(driver, base_url, log, known), checkpoint)
+
+        print("--- Scraping Testimonials ---")
+        testimonials_data = run_stage("testimonials", lambda: scrape_testimonials(driver, base_url, log), checkpoint)
+
+        with perf.span("save"):
+            if incremental:
+                save_incremental(products_data, reviews_data, testimonials_data)
+                checkpoint.clear()
+            else:
+                save_results(products_data, reviews_data, testimonials_data)
 
-        print(f"Success! Saved to: {data_folder}")
+        print("--- Wait Times ---")
+        log.print_summary()
+        log.save(WAITS_LOG)
 
     finally:
         driver.quit()
 
 if __name__ == "__main__":
-    # Check if "--headless" was passed as a command line argument
-    is_headless = "--headless" in sys.argv
-    scrape_all(headless_mode=is_headless)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape products, reviews and testimonials")
+    parser.add_argument("--headless", action="store_true", help="Scrape without a browser window")
+    parser.add_argument("--base-url", default=BASE_URL, help="Site to scrape (e.g. a local fixture server)")
+    parser.add_argument("--incremental", action="store_true", help="Resume from checkpoints and only upsert new/changed rows")
+    args = parser.parse_args()
+    scrape_all(headless_mode=args.headless, base_url=args.base_url, incremental=args.incremental)
@@ -1,14 +1,23 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import argparse
+import threading
 import time
 import os
 import sys # ADDED
 
 # Get correct paths globally
 script_dir = os.path.dirname(os.path.abspath(__file__))
-data_folder = os.path.join(script_dir, "..", "data")
+# Project root, for the shared modules next to app.py
+sys.path.insert(0, os.path.join(script_dir, ".."))
+import perf
+from storage import read_table
+from waits import WaitLog, load_page, paginate
+from incremental import Checkpoint, product_paths, unmapped_reviews
+from ingest import link_reviews_to_ids, save_mapping, score_new_reviews
 
 def get_driver(headless=False): # UPDATED
     options = Options()
@@ -18,73 +27,152 @@ def get_driver(headless=False): # UPDATED
         options.add_argument("--window-size=1920,1080")
     return webdriver.Chrome(options=options)
 
-def scrape_mapping(headless_mode=False): # UPDATED
-    driver = get_driver(headless=headless_mode)
-    base_url = "https://web-scraping.dev/products"
-    mapping_data = []
-    pid_counter = 1
+BASE_URL = "https://web-scraping.dev"
+PAGE_DELAY = 0 # optional extra politeness delay after each page (pages are already waited on)
+DETAIL_GRACE = 0.5 # how long a product page gets to show reviews before it counts as having none
+
+def collect_product_links(driver, base_url, delay, log=None):
+    # Listing pages in order, so pid = position in the catalog no matter which worker finishes first
+    log = log or WaitLog()
+    # Detail-page links; the link (not the title, titles repeat) finds an incremental run's stored pid
+    links = []
+
+    def parse_page(page_num):
+        links.extend(a.get_attribute('href') for a in driver.find_elements(By.CSS_SELECTOR, "h3 a"))
+        if delay:
+            with perf.span("sleep"):
+                time.sleep(delay)
+
+    paginate(driver, lambda n: f"{base_url}/products?page={n}", By.CLASS_NAME, "product", log, "products", parse_page)
+    return links
+
+def scrape_product_reviews(driver, pid, link, delay):
+    print(f"   Mapping pid {pid} from {link}")
+    load_page(driver, link, By.CSS_SELECTOR, "div.review", grace=DETAIL_GRACE)
+    if delay:
+        # Politeness delay, kept apart from the page load
+        with perf.span("sleep"):
+            time.sleep(delay)
 
     try:
-        for page_num in range(1, 7):
-            print(f"Accessing Product Page {page_num} (Headless={headless_mode})...")
-            driver.get(f"{base_url}?page={page_num}")
-            time.sleep(2)
-
-            links = [a.get_attribute('href') for a in driver.find_elements(By.CSS_SELECTOR, "h3 a")]
-
-            for link in links:
-                print(f"   Mapping pid {pid_counter} from {link}")
-                driver.get(link)
-                time.sleep(2)
-
-                try:
-                    reviews = driver.find_elements(By.CSS_SELECTOR, "div.review")
-                    if not reviews:
-                        mapping_data.append({"pid": pid_counter, "Review_Text": "No reviews found for this product."})
-                    else:
-                        for rev in reviews:
-                            text = rev.find_element(By.TAG_NAME, "p").text
-                            mapping_data.append({"pid": pid_counter, "Review_Text": text})
-                except Exception as e:
-                    print(f"    Error on pid {pid_counter}: {e}")
-                    mapping_data.append({"pid": pid_counter, "Review_Text": "Error extracting reviews."})
-                
-                pid_counter += 1
-        
-        # Save temp file to data folder
-        df = pd.DataFrame(mapping_data)
-        temp_path = os.path.join(data_folder, "product_reviews.csv")
-        df.to_csv(temp_path, index=False)
-        print(f"SUCCESS: Saved mapping to {temp_path}")
+        with perf.span("product_page.parse", pid=pid) as s:
+            reviews = driver.find_elements(By.CSS_SELECTOR, "div.review")
+            if not reviews:
+                return [{"pid": pid, "Review_Text": "No reviews found for this product."}]
+            rows = [{"pid": pid, "Review_Text": rev.find_element(By.TAG_NAME, "p").text} for rev in reviews]
+            s.rows = len(rows)
+            return rows
+    except Exception as e:
+        print(f"    Error on pid {pid}: {e}")
+        return [{"pid": pid, "Review_Text": "Error extracting reviews."}]
+
+def incremental_jobs(links, checkpoint, new_reviews=0):
+    # Stored pids by detail-page path. New products are always fetched. Products mapped before are
+    # fetched again when reviews came in since the last mapping (new_reviews scraped in this run, or
+    # stored ones the mapping has not seen): the listing does not tell which product they belong to.
+    # Pages finished before an interruption are skipped.
+    products = read_table("products")
+    pid_by_key = dict(zip(product_paths(products), products["pid"])) if not products.empty else {}
+    mapped = set(read_table("product_reviews", columns=["pid"])["pid"])
+    done = {int(pid) for pid in checkpoint.state.get("done", {})}
+    revisit = new_reviews + unmapped_reviews() > 0
+
+    jobs, unknown = [], 0
+    for link, key in zip(links, product_paths(pd.DataFrame({"Link": links}))):
+        pid = pid_by_key.get(key)
+        if pid is None:
+            unknown += 1
+        elif (revisit or pid not in mapped) and pid not in done:
+            jobs.append((int(pid), link))
+    print(f"   {len(jobs)} products to map ({'new reviews since the last mapping, ' if revisit else ''}"
+          f"{len(done)} from checkpoint, {unknown} not in the products table yet)")
+    return jobs
+
+def map_products(driver, jobs, headless_mode=False, workers=1, delay=PAGE_DELAY, checkpoint=None):
+    # Fetches the detail page of every (pid, link) job with `workers` Chrome instances in total:
+    # driver is the first worker's, the other workers-1 are started here. Returns the mapping rows sorted by pid.
+    spare = [driver]  # handed to the first worker thread, so the caller's browser does not sit idle
+    drivers = []      # started here, quit here (driver stays the caller's)
+    drivers_lock = threading.Lock()
+    local = threading.local()
+
+    def worker_driver():
+        # Each worker thread owns one Chrome for the whole crawl
+        if not hasattr(local, "driver"):
+            with drivers_lock:
+                local.driver = spare.pop() if spare else None
+            if local.driver is None:
+                local.driver = get_driver(headless=headless_mode)
+                with drivers_lock:
+                    drivers.append(local.driver)
+        return local.driver
+
+    def run(drv, pid, link):
+        rows = scrape_product_reviews(drv, pid, link, delay)
+        if checkpoint:
+            # Saved per product page, so a crash only loses the pages in flight
+            checkpoint.record("done", pid, rows)
+        return rows
 
+    try:
+        if workers <= 1:
+            results = [run(driver, pid, link) for pid, link in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda job: run(worker_driver(), job[0], job[1]), jobs))
     finally:
-        driver.quit()
+        for d in drivers:
+            d.quit()
 
-def link_reviews_to_ids():
-    print("--- Linking Product Reviews to Global Review IDs (rid) ---")
-    
-    prod_rev_path = os.path.join(data_folder, "product_reviews.csv")
-    global_rev_path = os.path.join(data_folder, "reviews.csv")
+    # pool.map keeps submission order, so rows come out sorted by pid
+    if checkpoint:
+        # Includes pages finished before an interruption
+        results = [checkpoint.state["done"][k] for k in sorted(checkpoint.state.get("done", {}), key=int)]
+    return pd.DataFrame([row for rows in results for row in rows], columns=["pid", "Review_Text"])
+
+def scrape_mapping(headless_mode=False, workers=1, base_url=BASE_URL, delay=PAGE_DELAY, save=True, incremental=False):
+    print(f"--- Mapping Product Reviews (Headless={headless_mode}, Workers={workers}, Incremental={incremental}) ---")
+    start = time.perf_counter()
+    driver = get_driver(headless=headless_mode)
 
     try:
-        product_reviews_df = pd.read_csv(prod_rev_path)
-        global_reviews_df = pd.read_csv(global_rev_path)
-    except FileNotFoundError:
-        print(f"Error: Make sure {prod_rev_path} and {global_rev_path} exist.")
-        return
-
-    text_to_id_map = dict(zip(
-        global_reviews_df['Review_Text'].str.strip(), 
-        global_reviews_df['rid']
-    ))
-
-    product_reviews_df['rid'] = product_reviews_df['Review_Text'].str.strip().map(text_to_id_map)
-    
-    product_reviews_df.to_csv(prod_rev_path, index=False)
-    matches = product_reviews_df['rid'].notna().sum()
-    print(f"SUCCESS: Linked {matches} reviews. Saved to: {prod_rev_path}")
+        with perf.span("stage.links") as s:
+            links = collect_product_links(driver, base_url, delay)
+            s.rows = len(links)
+        checkpoint = None
+        if incremental:
+            checkpoint = Checkpoint("scraper_product_reviews")
+            checkpoint.load()
+            jobs = incremental_jobs(links, checkpoint)
+        else:
+            jobs = list(enumerate(links, start=1))
+
+        with perf.span("stage.mapping", workers=workers) as s:
+            df = map_products(driver, jobs, headless_mode, workers, delay, checkpoint)
+            s.rows = len(jobs)
+        print(f"Mapped {len(jobs)} products in {time.perf_counter() - start:.1f}s")
+
+        if save:
+            with perf.span("save"):
+                save_mapping(df, incremental)
+            if checkpoint: checkpoint.clear()
+        return df
+
+    finally:
+        driver.quit()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Map every product to its reviews")
+    parser.add_argument("--headless", action="store_true", help="Scrape without a browser window")
+    parser.add_argument("--workers", type=int, default=1, help="Chrome instances fetching product pages in parallel (in total, including the one that lists the products)")
+    parser.add_argument("--base-url", default=BASE_URL, help="Site to scrape (e.g. a local fixture server)")
+    parser.add_argument("--delay", type=float, default=PAGE_DELAY, help="Seconds to wait after each page load")
+    parser.add_argument("--incremental", action="store_true", help="Only map products without stored reviews, resuming from checkpoints")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    is_headless = "--headless" in sys.argv # CHECK FOR FLAG
-    scrape_mapping(headless_mode=is_headless)
-    link_reviews_to_ids()
\ No newline at end of file
+    args = parse_args()
+    scrape_mapping(headless_mode=args.headless, workers=args.workers, base_url=args.base_url, delay=args.delay,
+                   incremental=args.incremental)
+    link_reviews_to_ids()
+    score_new_reviews()
\ No newline at end of file
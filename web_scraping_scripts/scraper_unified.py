@@ -0,0 +1,83 @@
+import pandas as pd
+import argparse
+import time
+import os
+import sys
+
+# One crawl for everything: a single Chrome walks the product listing once (rows and detail
+# links together), loads reviews and testimonials, then maps each product page in the same
+# session. Writes the same tables as scraper_all.py followed by scraper_product_reviews.py.
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, ".."))
+from scraper_all import BASE_URL, WAITS_LOG, get_driver, run_stage, scrape_products, scrape_reviews, scrape_testimonials
+from scraper_product_reviews import PAGE_DELAY, incremental_jobs, map_products
+from incremental import Checkpoint, natural_keys, stored_keys, upsert_scraped
+from ingest import link_reviews_to_ids, save_incremental, save_mapping, save_results, score_new_reviews
+import perf
+from waits import WaitLog
+
+
+def crawl_all(headless_mode=False, base_url=BASE_URL, workers=1, delay=PAGE_DELAY, incremental=False):
+    start = time.perf_counter()
+    driver = get_driver(headless=headless_mode)
+    log = WaitLog()
+    checkpoint = Checkpoint("scraper_unified") if incremental else None
+    if checkpoint: checkpoint.load()
+
+    try:
+        print(f"--- Scraping Products + Detail Links (Headless={headless_mode}, Incremental={incremental}) ---")
+        products_data = run_stage("products", lambda: scrape_products(driver, base_url, log, checkpoint), checkpoint)
+        links = [row["Link"] for row in products_data]
+
+        print("--- Scraping Reviews ---")
+        known = stored_keys("reviews") if incremental else None
+        reviews_data = run_stage("reviews", lambda: scrape_reviews(driver, base_url, log, known), checkpoint)
+
+        print("--- Scraping Testimonials ---")
+        testimonials_data = run_stage("testimonials", lambda: scrape_testimonials(driver, base_url, log), checkpoint)
+
+        # Product pages last, so an incremental run knows whether new reviews came in
+        print(f"--- Mapping Product Reviews (Workers={workers}) ---")
+        if incremental:
+            # Products go in first, so the mapping can use their stored pids
+            upsert_scraped("products", products_data)
+            new_reviews = int((~natural_keys("reviews", pd.DataFrame(reviews_data, columns=["Date", "Review_Text"]))
+                               .isin(known)).sum())
+            jobs = incremental_jobs(links, checkpoint, new_reviews)
+        else:
+            jobs = [(row["pid"], row["Link"]) for row in products_data]
+        with perf.span("stage.mapping", workers=workers) as s:
+            mapping_df = map_products(driver, jobs, headless_mode, workers, delay, checkpoint)
+            s.rows = len(jobs)
+
+        with perf.span("save"):
+            if incremental:
+                save_incremental(products_data, reviews_data, testimonials_data)
+            else:
+                save_results(products_data, reviews_data, testimonials_data)
+            save_mapping(mapping_df, incremental)
+        if checkpoint: checkpoint.clear()
+
+        print(f"Crawled {len(products_data)} products ({len(jobs)} detail pages), {len(reviews_data)} reviews, "
+              f"{len(testimonials_data)} testimonials in {time.perf_counter() - start:.1f}s")
+        print("--- Wait Times ---")
+        log.print_summary()
+        log.save(WAITS_LOG)
+
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape products, product reviews, reviews and testimonials in one browser session")
+    parser.add_argument("--headless", action="store_true", help="Scrape without a browser window")
+    parser.add_argument("--workers", type=int, default=1, help="Chrome instances fetching product pages, the shared session included (1 = the shared session only)")
+    parser.add_argument("--base-url", default=BASE_URL, help="Site to scrape (e.g. a local fixture server)")
+    parser.add_argument("--delay", type=float, default=PAGE_DELAY, help="Seconds to wait after each product page")
+    parser.add_argument("--incremental", action="store_true", help="Resume from checkpoints and only upsert new/changed rows")
+    args = parser.parse_args()
+
+    crawl_all(headless_mode=args.headless, base_url=args.base_url, workers=args.workers, delay=args.delay,
+              incremental=args.incremental)
+    link_reviews_to_ids()
+    score_new_reviews()
@@ -0,0 +1,128 @@
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+import json
+import time
+import os
+import perf
+
+# Condition-driven waits: every wait returns as soon as the DOM shows what we need,
+# and pagination stops when the content stops growing instead of after a fixed count
+WAIT_TIMEOUT = 10   # longest we wait for one page/batch to show up
+EMPTY_GRACE = 2     # how long an empty listing page gets before it counts as the end
+STABLE_TIMEOUT = 3  # a scroll that loads nothing within this is the end of an infinite list
+POLL = 0.1
+MAX_PAGES = 1000    # safety net against a site that never stops paging
+
+
+class WaitLog:
+    # Per-page wait times, so a slow crawl can be told apart from a slow site
+    def __init__(self):
+        self.entries = []
+
+    def record(self, stage, page, seconds, items):
+        self.entries.append({"stage": stage, "page": page, "wait_sec": round(seconds, 3), "items": items})
+
+    def summary(self):
+        stages = {}
+        for e in self.entries:
+            s = stages.setdefault(e["stage"], {"pages": 0, "wait_sec": 0.0, "items": 0})
+            s["pages"] += 1
+            s["wait_sec"] = round(s["wait_sec"] + e["wait_sec"], 3)
+            # Listing pages hold separate items; load-more/scroll batches report a running total
+            s["items"] = s["items"] + e["items"] if e["stage"] == "products" else max(s["items"], e["items"])
+        return stages
+
+    def print_summary(self):
+        for stage, s in self.summary().items():
+            print(f"   {stage}: {s['pages']} pages, {s['items']} items, {s['wait_sec']:.1f}s waiting")
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "pages": self.entries}, f, indent=2)
+
+
+def wait_until(driver, condition, timeout=WAIT_TIMEOUT):
+    # True when the condition held before the timeout
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL,
+                      ignored_exceptions=(StaleElementReferenceException,)).until(lambda d: condition(d))
+        return True
+    except TimeoutException:
+        return False
+
+
+def count(driver, by, selector):
+    return len(driver.find_elements(by, selector))
+
+
+def page_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def load_page(driver, url, by, selector, timeout=WAIT_TIMEOUT, grace=EMPTY_GRACE):
+    # Opens a page and waits until its items are there (or it is clearly empty)
+    with perf.span("page.fetch", url=url) as s:
+        start = time.perf_counter()
+        driver.get(url)
+        wait_until(driver, page_ready, timeout)
+        if not wait_until(driver, lambda d: count(d, by, selector) > 0, grace):
+            return 0, time.perf_counter() - start
+        s.rows = count(driver, by, selector)
+        return s.rows, time.perf_counter() - start
+
+
+def paginate(driver, url_for_page, by, selector, log, stage, parse_page, first_page=1):
+    # Walks ?page=1,2,... until a page has no items; parse_page runs on every loaded page
+    for page_num in range(first_page, first_page + MAX_PAGES):
+        n, waited = load_page(driver, url_for_page(page_num), by, selector)
+        log.record(stage, page_num, waited, n)
+        print(f"   {stage} page {page_num}: {n} items ({waited:.2f}s)")
+        if n == 0:
+            break
+        with perf.span(f"{stage}.parse", page=page_num):
+            parse_page(page_num)
+
+
+def click_load_more(driver, button_id, by, selector, log, stage="reviews", stop_when=None):
+    # Clicks until the button disappears or a click adds nothing; stop_when(driver) can end it earlier
+    batch = 0
+    wait_until(driver, lambda d: count(d, by, selector) > 0, EMPTY_GRACE)
+    while batch < MAX_PAGES:
+        before = count(driver, by, selector)
+        buttons = driver.find_elements(By.ID, button_id)
+        if not buttons:
+            break
+        if stop_when is not None and stop_when(driver):
+            break
+        with perf.span(f"{stage}.load_more", batch=batch + 1) as s:
+            start = time.perf_counter()
+            try:
+                driver.execute_script("arguments[0].scrollIntoView(); arguments[0].click();", buttons[0])
+            except StaleElementReferenceException:
+                continue
+            grew = wait_until(driver, lambda d: count(d, by, selector) > before or not d.find_elements(By.ID, button_id))
+            batch += 1
+            after = s.rows = count(driver, by, selector)
+        log.record(stage, batch, time.perf_counter() - start, after)
+        if not grew or after == before:
+            break
+    return count(driver, by, selector)
+
+
+def scroll_until_stable(driver, by, selector, log, stage="testimonials"):
+    # Scrolls to the bottom until a scroll no longer loads more items
+    batch = 0
+    wait_until(driver, lambda d: count(d, by, selector) > 0, EMPTY_GRACE)
+    while batch < MAX_PAGES:
+        before = count(driver, by, selector)
+        with perf.span(f"{stage}.scroll", batch=batch + 1):
+            start = time.perf_counter()
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            grew = wait_until(driver, lambda d: count(d, by, selector) > before, STABLE_TIMEOUT)
+        batch += 1
+        log.record(stage, batch, time.perf_counter() - start, count(driver, by, selector))
+        if not grew:
+            break
+    return count(driver, by, selector)
@@ -0,0 +1,96 @@
+import io
+import re
+from collections import Counter
+
+import pandas as pd
+
+from sentiment_cache import text_hash
+from storage import read_table, write_table
+
+# Word counts per month ("2023-05"), plus which review text has already been counted
+FREQ_TABLE = "word_freq"
+STATE_TABLE = "word_freq_state"
+
+# WordCloud's default word pattern; its collocations (word pairs) and plural folding are not reproduced,
+# so clouds are built from single-word counts only
+_word = re.compile(r"\w[\w']+")
+
+
+def _stopwords():
+    try:
+        from wordcloud import STOPWORDS
+        return set(STOPWORDS)
+    except ImportError:
+        return set()
+
+
+def tokenize(text, stopwords):
+    for word in _word.findall(str(text).lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word.isdigit() or word in stopwords:
+            continue
+        yield word
+
+
+def period_of(dates):
+    return pd.to_datetime(dates, errors="coerce").dt.strftime("%Y-%m")
+
+
+def update_word_freqs(store=None):
+    # Only reviews that are new since the last run are tokenized; months where a review
+    # changed or disappeared are recounted from scratch
+    reviews = read_table("reviews", columns=["rid", "Date", "Review_Text"], store=store)
+    reviews = reviews.assign(Period=period_of(reviews['Date']),
+                             Text_Hash=reviews['Review_Text'].astype(str).map(text_hash))
+    reviews = reviews.dropna(subset=["Period"])
+    state = read_table(STATE_TABLE, store=store)
+    freqs = read_table(FREQ_TABLE, store=store)
+
+    if state.empty or freqs.empty:
+        new_rows, stale_periods = reviews, set()
+        counts = Counter()
+    else:
+        known = state.drop_duplicates("rid").set_index("rid")
+        same = reviews['rid'].map(known['Text_Hash']) == reviews['Text_Hash']
+        same_period = reviews['rid'].map(known['Period']) == reviews['Period']
+        unchanged = same & same_period
+        changed = ~unchanged & reviews['rid'].isin(known.index)
+        gone = state[~state['rid'].isin(reviews['rid'])]
+        stale_periods = (set(gone['Period']) | set(reviews.loc[changed, 'Period'])
+                         | set(reviews.loc[changed, 'rid'].map(known['Period'])))
+        new_rows = reviews[~unchanged | reviews['Period'].isin(stale_periods)]
+        freqs = freqs[~freqs['period'].isin(stale_periods)]
+        counts = Counter({(p, w): c for p, w, c in zip(freqs['period'], freqs['word'], freqs['count'])})
+
+    if new_rows.empty and not stale_periods:
+        return 0
+
+    stopwords = _stopwords()
+    for period, text in zip(new_rows['Period'], new_rows['Review_Text']):
+        for word in tokenize(text, stopwords):
+            counts[(period, word)] += 1
+
+    write_table(FREQ_TABLE, pd.DataFrame(
+        [(p, w, c) for (p, w), c in counts.items()], columns=["period", "word", "count"]
+    ), store=store)
+    write_table(STATE_TABLE, reviews[["rid", "Text_Hash", "Period"]], store=store)
+    print(f"Word frequencies updated from {len(new_rows)} reviews")
+    return len(new_rows)
+
+
+def frequencies(periods, store=None):
+    # Several months are merged by summing their tables
+    freqs = read_table(FREQ_TABLE, columns=["word", "count"], filters=[("period", "in", list(periods))], store=store)
+    if freqs.empty:
+        return {}
+    return freqs.groupby("word")["count"].sum().to_dict()
+
+
+def render_png(freqs, width=800, height=300):
+    from wordcloud import WordCloud
+
+    cloud = WordCloud(width=width, height=height, background_color='black').generate_from_frequencies(freqs)
+    buffer = io.BytesIO()
+    cloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()